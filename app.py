@@ -1,19 +1,21 @@
 import streamlit as st
-import gspread
 import pandas as pd
-import plotly.express as px
-from googleapiclient.discovery import build
-from google.oauth2 import service_account
+import numpy as np
 import os
-from groq import Groq
 import base64 
 import json   
-import yfinance as yf
 import datetime as dt
 import time 
+import hashlib
+import re
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+# yfinance, plotly, groq and the Google API clients are imported inside the functions
+# that use them, so a worker boots without paying for all of them up front.
 
 # --- Import the Chat Tab ---
 from chat_tab import render_chat_tab
+from disk_cache import BoundedStore, FileCache
 # ---------------------------
 
 # --- Page Configuration ---
@@ -30,7 +32,16 @@ SCOPES_SHEETS = [
     'https://www.googleapis.com/auth/spreadsheets',
     'https://www.googleapis.com/auth/drive'
 ]
-SCOPES_DOCS = ['https://www.googleapis.com/auth/drive'] 
+# The principles Doc is exported through Drive, which only needs read access. get_gdoc_service
+# narrows the shared credentials to this scope, so the export client's token is read-only.
+SCOPES_DOCS = ['https://www.googleapis.com/auth/drive.readonly']
+# Upper bound on entries per st.cache_data function so old results get evicted
+CACHE_MAX_ENTRIES = 64
+# Google loaders are keyed by a fixed spreadsheet/doc ID, so a handful of entries is plenty
+LOADER_MAX_ENTRIES = 4
+# Sheet frames and price histories are only read after loading, so they live in
+# st.cache_resource and are shared as-is instead of being unpickled on every rerun.
+# Callers must not mutate them; take a .copy() first if that is ever needed.
 
 # --- AUTH & UTILITY FUNCTIONS ---
 
@@ -51,64 +62,220 @@ def get_creds_dict():
         return None
 
 @st.cache_resource
-def get_gsheet_client():
+def get_creds():
+    """
+    Service-account credentials parsed once and shared by every Google client,
+    scoped for Sheets and Drive; clients that need less narrow them with with_scopes.
+    """
+    from google.oauth2 import service_account
+
     creds_source = get_creds_dict()
     if creds_source is None: return None
     try:
         if isinstance(creds_source, dict):
-            creds = gspread.service_account_from_dict(creds_source, scopes=SCOPES_SHEETS)
-        else:
-            creds = gspread.service_account(filename=creds_source, scopes=SCOPES_SHEETS)
-        return creds
+            return service_account.Credentials.from_service_account_info(creds_source, scopes=SCOPES_SHEETS)
+        return service_account.Credentials.from_service_account_file(creds_source, scopes=SCOPES_SHEETS)
     except Exception as e:
-        st.error(f"An error occurred connecting to Google Sheets: {e}")
+        st.error(f"Error loading Google service account credentials: {e}")
         return None
 
+def _cached_http(creds):
+    """
+    Authorized httplib2 transport backed by an on-disk HTTP cache, so repeat GETs
+    are sent as conditional requests and unchanged resources come back as bodiless 304s.
+    """
+    import httplib2
+    from google_auth_httplib2 import AuthorizedHttp
+
+    return AuthorizedHttp(creds, http=httplib2.Http(cache=os.path.join('.cache', 'http')))
+
 @st.cache_resource
 def get_gdoc_service():
-    creds_source = get_creds_dict()
-    if creds_source is None: return None
+    """
+    Drive v3 service used to export the principles Doc as plain text.
+    Kept separate from get_drive_service because the two are used from different
+    loader threads and an httplib2 transport must not be shared across threads.
+    """
+    from googleapiclient.discovery import build
+    creds = get_creds()
+    if creds is None: return None
     try:
-        if isinstance(creds_source, dict):
-            doc_creds = service_account.Credentials.from_service_account_info(creds_source)
-            scoped_creds = doc_creds.with_scopes(SCOPES_DOCS)
-            service = build('docs', 'v1', credentials=scoped_creds)
-        else:
-            doc_creds = service_account.Credentials.from_service_account_file(creds_source, scopes=SCOPES_DOCS)
-            service = build('docs', 'v1', credentials=doc_creds)
-        return service
+        # A copy of the credentials whose token carries only SCOPES_DOCS
+        doc_creds = creds.with_scopes(SCOPES_DOCS)
+        return build('drive', 'v3', http=_cached_http(doc_creds), static_discovery=True, cache_discovery=False)
     except Exception as e:
         st.error(f"Error loading Google Doc: {e}")
         return None
 
+@st.cache_resource
+def get_sheets_service():
+    """Sheets v4 API service; lets one batchGet read several tabs in a single request."""
+    from googleapiclient.discovery import build
+    creds = get_creds()
+    if creds is None: return None
+    try:
+        return build('sheets', 'v4', http=_cached_http(creds), static_discovery=True, cache_discovery=False)
+    except Exception as e:
+        st.error(f"An error occurred connecting to Google Sheets: {e}")
+        return None
+
+@st.cache_resource
+def get_drive_service():
+    """Drive v3 service for spreadsheet lookups and change checks."""
+    from googleapiclient.discovery import build
+    creds = get_creds()
+    if creds is None: return None
+    try:
+        return build('drive', 'v3', credentials=creds, static_discovery=True, cache_discovery=False)
+    except Exception as e:
+        st.error(f"An error occurred connecting to Google Drive: {e}")
+        return None
+
+@st.cache_resource
+def get_spreadsheet_id(sheet_name):
+    """
+    Resolves a spreadsheet title to its ID through Drive once per process.
+    Failures raise rather than return None, because cache_resource would keep a None
+    for the life of the process while exceptions are retried on the next call.
+    """
+    drive = get_drive_service()
+    if drive is None: return None
+    query = (
+        f"name = '{sheet_name}' and "
+        "mimeType = 'application/vnd.google-apps.spreadsheet' and trashed = false"
+    )
+    files = drive.files().list(
+        q=query, fields="files(id)", pageSize=1,
+        supportsAllDrives=True, includeItemsFromAllDrives=True
+    ).execute().get('files', [])
+    if not files:
+        raise LookupError(f"Could not find a spreadsheet named '{sheet_name}'.")
+    return files[0]['id']
+
+@st.cache_resource
+def get_groq_client():
+    """
+    Shared Groq client, so reruns reuse its pooled HTTPS connections.
+    The SDK retries rate-limit (429) responses with exponential backoff.
+    """
+    from groq import Groq
+
+    return Groq(api_key=st.secrets["GROQ_API_KEY"], timeout=15, max_retries=4)
+
 # --- DATA LOADING ---
 
-@st.cache_data(ttl=600)
-def load_portfolio(_client, sheet_name):
+# Tabs fetched together with a single values.batchGet request
+SHEET_BUNDLE_TABS = ['Transactions', 'Rules']
+# Also fetched in the same request, but the sheet may not have them
+OPTIONAL_BUNDLE_TABS = ['Watchlist', 'Ticker']
+@st.cache_resource
+def get_file_cache():
+    """
+    The process-wide FileCache. Module globals are rebuilt on every rerun, so the
+    instance lives in st.cache_resource to keep its in-memory layer shared by all sessions.
+    """
+    return FileCache('.cache')
+
+# Raw Google responses are also kept on disk so a fresh server process starts warm.
+# (persist='disk' on st.cache_data would ignore the TTL, so this uses FileCache.)
+GOOGLE_CACHE = get_file_cache()
+GOOGLE_CACHE_TTL = 600
+# Entries keyed by the file's modifiedTime stay valid until the sheet or Doc is edited
+UNCHANGED_FILE_TTL = 24 * 60 * 60
+
+def _modified_time(drive, file_id):
+    """Drive modifiedTime of a file (a tiny metadata call), or None if unavailable."""
+    if drive is None: return None
+    try:
+        return drive.files().get(
+            fileId=file_id, fields='modifiedTime', supportsAllDrives=True
+        ).execute().get('modifiedTime')
+    except Exception as e:
+        print(f"Could not read modifiedTime for {file_id}: {e}")
+        return None
+
+@st.cache_data(ttl=600, max_entries=LOADER_MAX_ENTRIES, show_spinner=False)
+def load_sheet_bundle(_sheets_service, spreadsheet_id):
+    """
+    Reads every tab in SHEET_BUNDLE_TABS and OPTIONAL_BUNDLE_TABS in one round-trip.
+    Returns {tab_name: rows}, where rows is the raw 2D list of cell values (header first);
+    optional tabs missing from the spreadsheet map to None.
+    """
+    from googleapiclient.errors import HttpError
+
+    # An unchanged spreadsheet reuses the bundle already on disk instead of downloading every tab again
+    modified_time = _modified_time(get_drive_service(), spreadsheet_id)
+    params = {
+        'tabs': SHEET_BUNDLE_TABS + OPTIONAL_BUNDLE_TABS, 'render': 'UNFORMATTED_VALUE', 'modified': modified_time
+    }
+    ttl = UNCHANGED_FILE_TTL if modified_time else GOOGLE_CACHE_TTL
+    bundle = GOOGLE_CACHE.get(spreadsheet_id, 'sheet_bundle', params, ttl)
+    if bundle is not None:
+        return bundle
+    
+    def batch_get(tabs):
+        response = _sheets_service.spreadsheets().values().batchGet(
+            spreadsheetId=spreadsheet_id,
+            ranges=[f"{tab}!A:Z" for tab in tabs],
+            # Numbers arrive as JSON numbers instead of display strings like "1,20,000"
+            valueRenderOption='UNFORMATTED_VALUE',
+        ).execute()
+        return {
+            tab: value_range.get('values', [])
+            for tab, value_range in zip(tabs, response.get('valueRanges', []))
+        }
+    
+    try:
+        bundle = batch_get(SHEET_BUNDLE_TABS + OPTIONAL_BUNDLE_TABS)
+    except HttpError as e:
+        # A missing tab fails the whole batch with a 400; list the sheet's tabs and
+        # retry with the optional ones that exist
+        if e.resp.status != 400:
+            raise
+        sheets = _sheets_service.spreadsheets().get(
+            spreadsheetId=spreadsheet_id, fields='sheets.properties.title'
+        ).execute().get('sheets', [])
+        existing = {sheet['properties']['title'] for sheet in sheets}
+        present = [tab for tab in OPTIONAL_BUNDLE_TABS if tab in existing]
+        bundle = batch_get(SHEET_BUNDLE_TABS + present)
+        bundle.update(dict.fromkeys(tab for tab in OPTIONAL_BUNDLE_TABS if tab not in existing))
+    GOOGLE_CACHE.set(spreadsheet_id, 'sheet_bundle', params, bundle)
+    return bundle
+
+def _values_to_frame(rows):
+    """Builds a DataFrame from a header row plus data rows, padding short rows with ''."""
+    if not rows:
+        return pd.DataFrame()
+    header = rows[0]
+    df = pd.DataFrame(rows[1:]).reindex(columns=range(len(header))).fillna('')
+    df.columns = header
+    return df
+
+@st.cache_resource(ttl=600, max_entries=LOADER_MAX_ENTRIES, show_spinner=False)
+def load_portfolio(_sheets_service, spreadsheet_id):
     """
     Loads 'Transactions' sheet and groups by Asset/Category to create a Portfolio view.
     """
-    if not _client: return pd.DataFrame()
+    if not _sheets_service or not spreadsheet_id: return pd.DataFrame()
     try:
-        sheet = _client.open(sheet_name).worksheet("Transactions")
-        data = sheet.get_all_records()
-        raw_df = pd.DataFrame(data)
+        raw_df = _values_to_frame(load_sheet_bundle(_sheets_service, spreadsheet_id)['Transactions'])
         
         required_cols = ['Asset', 'Category', 'Invested Value (Rs)']
-        if not all(col in raw_df.columns for col in required_cols):
+        if not set(required_cols).issubset(raw_df.columns):
             st.error(f"Error: 'Transactions' sheet must have columns: {', '.join(required_cols)}")
             return pd.DataFrame()
 
-        raw_df['Invested Value (Rs)'] = pd.to_numeric(
-            raw_df['Invested Value (Rs)'].astype(str).str.replace(',', ''), errors='coerce'
+        # UNFORMATTED_VALUE already returns numeric cells as numbers; only text
+        # cells (e.g. "1,200" typed as a string) still need their commas stripped.
+        invested = pd.to_numeric(
+            raw_df['Invested Value (Rs)'].replace(',', '', regex=True), errors='coerce'
         ).fillna(0)
         
-        # Clean: Remove rows where Asset name is empty or Value is 0
-        raw_df = raw_df[raw_df['Asset'].astype(str).str.strip() != '']
-        raw_df = raw_df[raw_df['Invested Value (Rs)'] > 0]
+        # Clean: Remove rows where Asset name is empty or Value is 0 (one mask, one filtered copy)
+        keep = (raw_df['Asset'].astype(str).str.strip() != '') & (invested > 0)
+        raw_df = raw_df.loc[keep, ['Asset', 'Category']].assign(Current_Value=invested[keep])
 
-        portfolio_df = raw_df.groupby(['Asset', 'Category'])[['Invested Value (Rs)']].sum().reset_index()
-        portfolio_df.rename(columns={'Invested Value (Rs)': 'Current_Value'}, inplace=True)
+        portfolio_df = raw_df.groupby(['Asset', 'Category'])[['Current_Value']].sum().reset_index()
 
         return portfolio_df
         
@@ -116,15 +283,13 @@ def load_portfolio(_client, sheet_name):
         st.error(f"Error processing 'Transactions' tab: {e}")
         return pd.DataFrame()
 
-@st.cache_data(ttl=600)
-def load_rules_from_sheet(_client, sheet_name):
-    if not _client: return pd.DataFrame()
+@st.cache_resource(ttl=600, max_entries=LOADER_MAX_ENTRIES, show_spinner=False)
+def load_rules_from_sheet(_sheets_service, spreadsheet_id):
+    if not _sheets_service or not spreadsheet_id: return pd.DataFrame()
     try:
-        sheet = _client.open(sheet_name).worksheet("Rules")
-        data = sheet.get_all_records()
-        df = pd.DataFrame(data)
+        df = _values_to_frame(load_sheet_bundle(_sheets_service, spreadsheet_id)['Rules'])
         required_cols = ['Category', 'Target_Percentage', 'Rebalance_Threshold']
-        if not all(col in df.columns for col in required_cols):
+        if not set(required_cols).issubset(df.columns):
             st.error(f"Error: 'Rules' sheet must have columns: {', '.join(required_cols)}")
             return pd.DataFrame()
         df['Target_Percentage'] = pd.to_numeric(df['Target_Percentage'])
@@ -134,27 +299,31 @@ def load_rules_from_sheet(_client, sheet_name):
         st.error(f"Error loading 'Rules' tab: {e}")
         return pd.DataFrame()
 
-@st.cache_data(ttl=600)
-def load_watchlist(_client, sheet_name):
-    if not _client: return pd.DataFrame()
+@st.cache_resource(ttl=600, max_entries=LOADER_MAX_ENTRIES, show_spinner=False)
+def load_watchlist(_sheets_service, spreadsheet_id):
+    if not _sheets_service or not spreadsheet_id: return pd.DataFrame()
     try:
-        sheet = _client.open(sheet_name).worksheet("Watchlist")
-        data = sheet.get_all_records()
-        df = pd.DataFrame(data)
+        rows = load_sheet_bundle(_sheets_service, spreadsheet_id)['Watchlist']
+        if rows is None:
+            st.error("Error loading 'Watchlist' tab: the spreadsheet has no 'Watchlist' tab.")
+            return pd.DataFrame()
+        df = _values_to_frame(rows)
         df['Dip_Threshold_Percent'] = pd.to_numeric(df['Dip_Threshold_Percent'])
         return df
     except Exception as e:
         st.error(f"Error loading 'Watchlist' tab: {e}")
         return pd.DataFrame()
 
-@st.cache_data(ttl=600)
-def load_ticker_map(_client, sheet_name):
+@st.cache_resource(ttl=600, max_entries=LOADER_MAX_ENTRIES, show_spinner=False)
+def load_ticker_map(_sheets_service, spreadsheet_id):
     """Loads the explicit Asset -> Ticker mapping from the 'Ticker' sheet."""
-    if not _client: return pd.DataFrame()
+    if not _sheets_service or not spreadsheet_id: return pd.DataFrame()
     try:
-        sheet = _client.open(sheet_name).worksheet("Ticker")
-        data = sheet.get_all_records()
-        df = pd.DataFrame(data)
+        rows = load_sheet_bundle(_sheets_service, spreadsheet_id)['Ticker']
+        if rows is None:
+            st.warning("Could not find a 'Ticker' tab. Performance table will be empty.")
+            return pd.DataFrame()
+        df = _values_to_frame(rows)
         if 'Asset' not in df.columns or 'Ticker' not in df.columns:
             st.error("Error: 'Ticker' sheet must have columns 'Asset' and 'Ticker'.")
             return pd.DataFrame()
@@ -163,19 +332,22 @@ def load_ticker_map(_client, sheet_name):
         st.warning(f"Could not load 'Ticker' tab. Performance table may be empty. Error: {e}")
         return pd.DataFrame()
 
-@st.cache_data(ttl=600)
+@st.cache_data(ttl=600, max_entries=LOADER_MAX_ENTRIES, show_spinner=False)
 def load_rules_from_doc(_doc_service, document_id):
     if not _doc_service: return None 
+    # Same service as the export, so this stays on the doc loader's own connection
+    modified_time = _modified_time(_doc_service, document_id)
+    params = {'modified': modified_time}
+    ttl = UNCHANGED_FILE_TTL if modified_time else GOOGLE_CACHE_TTL
+    rules_text = GOOGLE_CACHE.get(document_id, 'doc_text', params, ttl)
+    if rules_text is not None:
+        return rules_text
     try:
-        document = _doc_service.documents().get(documentId=document_id).execute()
-        content = document.get('body').get('content')
-        rules_text = ""
-        for value in content:
-            if 'paragraph' in value:
-                elements = value.get('paragraph').get('elements')
-                for elem in elements:
-                    if 'textRun' in elem:
-                        rules_text += elem.get('textRun').get('content')
+        # Drive renders the Doc to text server-side, so there is no Docs JSON tree to walk
+        exported = _doc_service.files().export(fileId=document_id, mimeType='text/plain').execute()
+        # The export starts with a BOM and uses CRLF line endings
+        rules_text = exported.decode('utf-8-sig').replace('\r\n', '\n')
+        GOOGLE_CACHE.set(document_id, 'doc_text', params, rules_text)
         return rules_text
     except Exception as e:
         st.error(f"Error loading Google Doc: {e}")
@@ -183,41 +355,193 @@ def load_rules_from_doc(_doc_service, document_id):
 
 # --- INTELLIGENT ANALYST FUNCTIONS ---
 
-@st.cache_data(ttl=600)
-def get_llm_summary(rebalance_insights, market_insights, news_insights):
+# One streamed summary per render can afford the larger model; the many short
+# sentiment classifications stay on the fastest one.
+SUMMARY_MODEL = "llama-3.3-70b-versatile"
+SENTIMENT_MODEL = "llama-3.1-8b-instant"
+# System prompts are fixed strings with all per-request data in the user message,
+# so every call shares the same prompt prefix
+SUMMARY_SYSTEM_PROMPT = (
+    "You are a concise personal finance assistant. "
+    "Summarize these alerts: 1) Portfolio Alerts, 2) Market Opportunities, 3) News Sentiment. "
+    "Prioritize Alerts. Be brief (3-4 sentences). No markdown."
+)
+SENTIMENT_SYSTEM_PROMPT = (
+    "Analyze news sentiment for each numbered asset. "
+    "Output exactly one line per asset, in the same order, each in the format: "
+    "SENTIMENT: [Asset] is [POSITIVE/NEGATIVE/NEUTRAL] due to [Reason]."
+)
+# The summary is generated at temperature 0, so the same insights always give the
+# same text; it only needs regenerating when the insights change.
+SUMMARY_CACHE_TTL = 24 * 60 * 60
+SUMMARY_MAX_TOKENS = 200
+# st.cache_data cannot cache a token stream, so finished summaries are stored here
+# (memory plus disk) and replayed without a Groq call, even after a restart.
+LLM_CACHE = get_file_cache()
+
+def _summary_request(rebalance_insights, market_insights, news_insights):
+    """Chat-completion kwargs for the combined summary."""
+    insights_text = "Internal Portfolio Alerts:\n" + "\n".join(rebalance_insights)
+    insights_text += "\n\nExternal Market Opportunities:\n" + "\n".join(market_insights)
+    insights_text += "\n\nRecent News Sentiment:\n" + "\n".join(news_insights) 
+    
+    user_prompt = f"Here are today's alerts:\n{insights_text}"
+    return {
+        "messages": [
+            {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ],
+        "model": SUMMARY_MODEL,
+        # 3-4 sentences fit comfortably; the cap stops a rambling reply early
+        "max_tokens": SUMMARY_MAX_TOKENS,
+        "temperature": 0.0,
+    }
+
+@st.cache_resource
+def _llm_executor():
+    """Background pool that opens Groq summary streams while the page keeps rendering."""
+    return ThreadPoolExecutor(max_workers=2)
+
+def _summary_key(rebalance_insights, market_insights, news_insights):
+    """Short digest of the three insight lists, so the store does not hold every message as its key."""
+    payload = json.dumps([rebalance_insights, market_insights, news_insights])
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+def start_llm_summary(rebalance_insights, market_insights, news_insights):
+    """
+    Starts the combined AI summary without blocking the render.
+    Returns (cache_key, result): result is the finished text when no Groq call is needed,
+    otherwise a Future for the opened completion stream. Pass it to render_llm_summary.
+    """
     if not rebalance_insights and not market_insights and not news_insights:
-        return "No specific insights to summarize today. All systems normal."
+        return None, "No specific insights to summarize today. All systems normal."
         
     if 'GROQ_API_KEY' not in st.secrets:
-        return "GROQ_API_KEY not found in Streamlit secrets."
+        return None, "GROQ_API_KEY not found in Streamlit secrets."
+    
+    # Duplicates and ordering don't change the summary; normalizing them lets the
+    # same day's insights hit the cache however the sections happened to emit them.
+    rebalance_insights, market_insights, news_insights = (
+        sorted(set(insights)) for insights in (rebalance_insights, market_insights, news_insights)
+    )
+    key = _summary_key(rebalance_insights, market_insights, news_insights)
+    cached = LLM_CACHE.get('groq', 'summary', {'insights': key, 'model': SUMMARY_MODEL}, SUMMARY_CACHE_TTL)
+    if cached is not None:
+        return None, cached
+    
+    # Resolve the client here; the worker itself makes no Streamlit calls
+    client = get_groq_client()
+    request = _summary_request(rebalance_insights, market_insights, news_insights)
+    return key, _llm_executor().submit(client.chat.completions.create, **request, stream=True)
+
+def render_llm_summary(placeholder, pending):
+    """
+    Fills `placeholder` with the summary started by start_llm_summary. A fresh reply is
+    streamed in token by token; the finished text is cached and returned.
+    """
+    key, result = pending
+    if isinstance(result, str):
+        placeholder.info(f"**{result}**")
+        return result
         
     try:
-        client = Groq(api_key=st.secrets["GROQ_API_KEY"])
-        insights_text = "Internal Portfolio Alerts:\n" + "\n".join(rebalance_insights)
-        insights_text += "\n\nExternal Market Opportunities:\n" + "\n".join(market_insights)
-        insights_text += "\n\nRecent News Sentiment:\n" + "\n".join(news_insights) 
-        
-        system_prompt = (
-            "You are a concise personal finance assistant. "
-            "Summarize these alerts: 1) Portfolio Alerts, 2) Market Opportunities, 3) News Sentiment. "
-            "Prioritize Alerts. Be brief (3-4 sentences). No markdown."
-        )
-        user_prompt = f"Here are today's alerts:\n{insights_text}"
-        
-        chat_completion = client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            model="llama-3.1-8b-instant",
-            temperature=0.7,
-        )
-        return chat_completion.choices[0].message.content
+        stream = result.result()
+        with placeholder.container():
+            summary = st.write_stream(chunk.choices[0].delta.content or "" for chunk in stream)
     except Exception as e:
-        st.error(f"Error connecting to Groq API: {e}")
+        placeholder.error(f"Error connecting to Groq API: {e}")
         return None
+    
+    if not summary:
+        placeholder.empty()
+        return None
+    # Swap the streamed text for the usual callout once generation is done
+    placeholder.info(f"**{summary}**")
+    LLM_CACHE.set('groq', 'summary', {'insights': key, 'model': SUMMARY_MODEL}, summary)
+    return summary
+
+NEWS_MAX_WORKERS = 8
+# Larger batches start to lose accuracy on the 8B model, so bigger
+# watchlists are split into several calls.
+NEWS_BATCH_SIZE = 16
+SENTIMENT_MAX_TOKENS = 48
+SENTIMENT_MAX_CONCURRENCY = 4
+SENTIMENT_CACHE_MAX_ENTRIES = 512
+SENTIMENT_RE = re.compile(r'\b(POSITIVE|NEGATIVE|NEUTRAL)\b', re.IGNORECASE)
+SENTIMENT_DISPLAY = {'POSITIVE': st.success, 'NEGATIVE': st.error, 'NEUTRAL': st.info}
 
-@st.cache_data(ttl=600)
+@st.cache_resource
+def _sentiment_store():
+    """
+    Process-wide {headline key: sentiment line} map shared across sessions, so an
+    unchanged headline set is never sent to Groq twice.
+    """
+    return BoundedStore(SENTIMENT_CACHE_MAX_ENTRIES)
+
+def _headline_key(asset_name, headlines_text):
+    """Order-insensitive digest of an asset's headlines (the asset name is part of the reply)."""
+    normalized = "\n".join(sorted(line.strip().lower() for line in headlines_text.splitlines()))
+    return hashlib.blake2b(f"{asset_name}\n{normalized}".encode(), digest_size=16).hexdigest()
+
+def _fetch_news(ticker_symbol):
+    """
+    Fetches the news list for one ticker.
+    Runs inside a worker thread that carries the script context (get_ticker is an
+    st.cache_resource), but it must not render anything; errors are returned instead.
+    Returns (news_list, error or None).
+    """
+    try:
+        return cached_news(ticker_symbol), None
+    except Exception as e:
+        return None, e
+
+def _sentiment_request(items):
+    """
+    Builds the chat-completion arguments that classify several assets at once.
+    `items` is a list of (asset_name, ticker_symbol, headlines_text).
+    """
+    blocks = "\n\n".join(
+        f"{i}) {asset_name} ({ticker_symbol}) headlines:\n{headlines_text}"
+        for i, (asset_name, ticker_symbol, headlines_text) in enumerate(items, start=1)
+    )
+    return {
+        "messages": [
+            {"role": "system", "content": SENTIMENT_SYSTEM_PROMPT},
+            {"role": "user", "content": f"{len(items)} assets:\n\n{blocks}"}
+        ],
+        "model": SENTIMENT_MODEL,
+        # Output tokens dominate latency; each answer is one short sentence
+        "max_tokens": SENTIMENT_MAX_TOKENS * len(items),
+        "temperature": 0.0,
+    }
+
+def _parse_sentiments(content, items):
+    """
+    Matches a batched reply's SENTIMENT lines to `items`, in order. Each line must name
+    its asset, so a skipped asset gets None instead of shifting its neighbours' answers.
+    """
+    # Drop any "1)" style numbering the model puts in front of each line
+    lines = [line[line.find("SENTIMENT:"):].strip() for line in content.splitlines() if "SENTIMENT:" in line]
+    sentiments, position = [], 0
+    for asset_name, _, _ in items:
+        name = asset_name.lower()
+        match = next((i for i in range(position, len(lines)) if name in lines[i].lower()), None)
+        if match is None:
+            sentiments.append(None)
+            continue
+        sentiments.append(lines[match])
+        position = match + 1
+    return sentiments
+
+def _batch_sentiment(client, items):
+    """
+    Classifies several assets in a single Groq call.
+    Returns one sentiment line per item, in the same order (None where the model skipped one).
+    """
+    chat_completion = client.chat.completions.create(**_sentiment_request(items), stream=False)
+    return _parse_sentiments(chat_completion.choices[0].message.content, items)
+
+@st.cache_data(ttl=600, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
 def analyze_market_news(ticker_df):
     news_insights = []
     st.header("📰 News Sentiment Analysis")
@@ -229,167 +553,358 @@ def analyze_market_news(ticker_df):
         st.info("No assets found in Ticker sheet for news analysis.")
         return []
 
-    client = Groq(api_key=st.secrets["GROQ_API_KEY"])
+    client = get_groq_client()
+    
+    # Fan the news requests out over a thread pool, once per distinct symbol.
+    # Workers get the script context because cached_news goes through st.cache_resource.
+    symbols = list(dict.fromkeys(ticker_df['Ticker']))
+    with ThreadPoolExecutor(
+        max_workers=NEWS_MAX_WORKERS, initializer=add_script_run_ctx, initargs=(None, get_script_run_ctx())
+    ) as executor:
+        news_map = dict(zip(symbols, executor.map(_fetch_news, symbols)))
     
-    for index, row in ticker_df.iterrows():
-        ticker_symbol = row['Ticker']
+    # Render on the main thread; Streamlit calls are not safe inside workers.
+    to_classify = []
+    for rec in ticker_df.itertuples(index=False):
+        ticker_symbol = rec.Ticker
         # Handle 'Asset' column (Ticker sheet) vs 'Asset_Name' (fallback)
-        asset_name = row.get('Asset', row.get('Asset_Name', 'Unknown Asset'))
+        asset_name = getattr(rec, 'Asset', getattr(rec, 'Asset_Name', 'Unknown Asset'))
+        news_list, error = news_map[ticker_symbol]
         
-        try:
-            ticker_obj = yf.Ticker(ticker_symbol)
-            news_list = ticker_obj.news
-            
-            # Check for news availability
-            if not news_list:
-                st.warning(f"I couldn't find any news for {asset_name}.")
-                continue
-                
-            headlines = [item.get('title', '') for item in news_list[:3]]
-            headlines_text = "\n".join(headlines)
-            
-            if not headlines_text:
-                st.warning(f"I couldn't find any news for {asset_name}.")
-                continue
-
-            system_prompt = (
-                f"Analyze sentiment for {asset_name} ({ticker_symbol}). "
-                f"Output SINGLE sentence format: "
-                f"SENTIMENT: [Asset] is [POSITIVE/NEGATIVE/NEUTRAL] due to [Reason]."
-            )
-            
-            chat_completion = client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"Headlines:\n{headlines_text}"}
-                ],
-                model="llama-3.1-8b-instant",
-                temperature=0.5,
-            )
-            
-            sentiment_summary = chat_completion.choices[0].message.content.strip()
-            
-            if "SENTIMENT:" in sentiment_summary:
-                if 'POSITIVE' in sentiment_summary.upper():
-                    st.success(f"**{sentiment_summary}**")
-                elif 'NEGATIVE' in sentiment_summary.upper():
-                    st.error(f"**{sentiment_summary}**")
-                else:
-                    st.info(f"**{sentiment_summary}**")
-                news_insights.append(sentiment_summary)
-            else:
-                st.write(f"**{asset_name}:** {sentiment_summary}")
-                news_insights.append(sentiment_summary)
-
-            time.sleep(0.5) 
-            
-        except Exception as e:
-            st.warning(f"Could not analyze news for {asset_name}: {e}")
+        if error is not None:
+            st.warning(f"Could not analyze news for {asset_name}: {error}")
+            continue
+        
+        headlines_text = "\n".join(item.get('title', '') for item in (news_list or [])[:3])
+        if not headlines_text:
+            st.warning(f"I couldn't find any news for {asset_name}.")
+            continue
+        to_classify.append((asset_name, ticker_symbol, headlines_text))
+    
+    # Assets whose headlines were already classified reuse that answer without a Groq call
+    store = _sentiment_store()
+    keys = [_headline_key(asset_name, headlines) for asset_name, _, headlines in to_classify]
+    sentiments = [store.get(key) for key in keys]
+    pending = [i for i, sentiment in enumerate(sentiments) if sentiment is None]
+    index_chunks = [pending[start:start + NEWS_BATCH_SIZE] for start in range(0, len(pending), NEWS_BATCH_SIZE)]
+    chunks = [[to_classify[i] for i in index_chunk] for index_chunk in index_chunks]
+    
+    # Chunks are classified concurrently (capped to stay under the rate limit);
+    # failures are reported once everything is back.
+    results, errors = [None] * len(chunks), {}
+    if chunks:
+        def classify(i):
+            try:
+                return _batch_sentiment(client, chunks[i]), None
+            except Exception as e:
+                return None, e
+        indices = range(len(chunks))
+        with ThreadPoolExecutor(max_workers=min(SENTIMENT_MAX_CONCURRENCY, len(chunks))) as executor:
+            for i, (chunk_sentiments, error) in zip(indices, executor.map(classify, indices)):
+                results[i], errors[i] = chunk_sentiments, error
+    
+    failed = set()
+    for i, index_chunk in enumerate(index_chunks):
+        if errors.get(i) is not None:
+            st.warning(f"Could not analyze news for {', '.join(item[0] for item in chunks[i])}: {errors[i]}")
+            failed.update(index_chunk)
+            continue
+        for item_index, sentiment_summary in zip(index_chunk, results[i]):
+            sentiments[item_index] = sentiment_summary
+            if sentiment_summary:
+                store[keys[item_index]] = sentiment_summary
+    
+    for i, (asset_name, _, _) in enumerate(to_classify):
+        if i in failed:
+            continue
+        sentiment_summary = sentiments[i]
+        if not sentiment_summary:
+            st.warning(f"Could not determine news sentiment for {asset_name}.")
+            continue
+        
+        match = SENTIMENT_RE.search(sentiment_summary)
+        display = SENTIMENT_DISPLAY.get(match.group(1).upper() if match else '', st.info)
+        display(f"**{sentiment_summary}**")
+        news_insights.append(sentiment_summary)
             
     return news_insights
 
-def generate_rebalance_insights(portfolio_df, rules_df):
-    """Checks for internal portfolio allocation drift."""
-    insight_messages = [] 
+@st.cache_data(ttl=600, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def summarize_portfolio(portfolio_df):
+    """
+    Per-category totals with their share of the portfolio, plus the overall total.
+    Cached so widget reruns reuse the aggregation while the sheet data is unchanged.
+    """
+    total_value = portfolio_df['Current_Value'].sum()
+    category_df = portfolio_df.groupby('Category', sort=False)['Current_Value'].sum().reset_index()
+    category_df['Current_Percentage'] = (category_df['Current_Value'] / total_value) * 100
+    return category_df, total_value
+
+@st.cache_data(ttl=600, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def compute_rebalance_insights(rules_df, category_df):
+    """
+    Pure drift check behind generate_rebalance_insights.
+    Returns (alert_messages, ok_messages) so reruns with unchanged data skip the pandas work.
+    """
+    # Look up each rule's current share by category; no merged frame is needed
+    current_pct = rules_df['Category'].map(
+        category_df.set_index('Category')['Current_Percentage']
+    ).fillna(0)
+    merged_df = rules_df.assign(
+        Current_Percentage=current_pct, Drift=current_pct - rules_df['Target_Percentage']
+    )
+    merged_df['Is_Alert'] = merged_df['Drift'].abs() > merged_df['Rebalance_Threshold']
+    
+    # Build every message as whole columns
+    category = merged_df['Category'].astype(str)
+    curr_text = merged_df['Current_Percentage'].map('{:.1f}'.format)
+    drift_text = merged_df['Drift'].abs().map('{:.1f}'.format)
+    status = pd.Series(
+        np.where(merged_df['Drift'] > 0, "over-allocated", "under-allocated"), index=merged_df.index
+    )
+    alert_messages = (
+        "ALERT: Your '" + category + "' is " + curr_text + "% (Target: "
+        + merged_df['Target_Percentage'].astype(str) + "%). " + drift_text + "% " + status + "."
+    )
+    ok_messages = "OK: '" + category + "' is " + curr_text + "% (Within threshold)."
+    
+    is_alert = merged_df['Is_Alert']
+    return alert_messages[is_alert].tolist(), ok_messages[~is_alert].tolist()
+
+def generate_rebalance_insights(portfolio_df, rules_df, category_df=None):
+    """
+    Checks for internal portfolio allocation drift and renders the result.
+    Pass the dashboard's `category_df` from summarize_portfolio to skip a second groupby.
+    """
     if portfolio_df.empty or rules_df.empty:
         return []
     try:
         st.header("🤖 Agent Insights (Rebalancing)")
-        category_df = portfolio_df.groupby('Category')['Current_Value'].sum().reset_index()
-        total_value = category_df['Current_Value'].sum()
-        category_df['Current_Percentage'] = (category_df['Current_Value'] / total_value) * 100
-        merged_df = pd.merge(rules_df, category_df, on='Category', how='left')
-        merged_df['Current_Percentage'] = merged_df['Current_Percentage'].fillna(0)
-        merged_df['Drift'] = merged_df['Current_Percentage'] - merged_df['Target_Percentage']
-        merged_df['Is_Alert'] = abs(merged_df['Drift']) > merged_df['Rebalance_Threshold']
+        if category_df is None:
+            category_df, _ = summarize_portfolio(portfolio_df)
+        insight_messages, ok_messages = compute_rebalance_insights(rules_df, category_df)
         
-        for _, row in merged_df.iterrows():
-            curr_perc = row['Current_Percentage']
-            target_perc = row['Target_Percentage']
-            drift = row['Drift']
-            threshold = row['Rebalance_Threshold']
-            if row['Is_Alert']:
-                status = "over-allocated" if drift > 0 else "under-allocated"
-                message = f"ALERT: Your '{row['Category']}' is {curr_perc:.1f}% (Target: {target_perc}%). {abs(drift):.1f}% {status}."
-                st.error(f"**{message}**")
-                insight_messages.append(message)
-            else:
-                message = f"OK: '{row['Category']}' is {curr_perc:.1f}% (Within threshold)."
-                st.success(f"**{message}**")
+        # One element per status instead of one per rule row keeps the frontend traffic constant
+        if insight_messages:
+            st.error("\n\n".join(f"**{message}**" for message in insight_messages))
+        if ok_messages:
+            st.success("\n\n".join(f"**{message}**" for message in ok_messages))
         return insight_messages
     except Exception as e:
         st.error(f"Rebalancing check error: {e}")
         return []
 
 # --- UPDATED MARKET SCOUT FUNCTION (Uses Ticker Sheet) ---
-@st.cache_data(ttl=600)
-def check_market_dips(ticker_df):
-    """Checks for external market buying opportunities using Ticker sheet."""
-    insight_messages = []
+@st.cache_data(ttl=600, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def check_market_dips(ticker_df, histories):
+    """
+    Checks for external market buying opportunities using Ticker sheet.
+    `histories` is the {ticker: 1y history} dict prefetched by load_price_history.
+    """
     if ticker_df.empty: 
         st.info("No assets found for market scout.")
         return []
     
     st.header("📈 Market Opportunities (Scout)")
     
-    today = dt.date.today()
-    one_year_ago = today - dt.timedelta(days=365)
-    
     # Default threshold since Ticker sheet might not have one
     DEFAULT_THRESHOLD = 5.0
     
-    for _, row in ticker_df.iterrows():
-        try:
-            ticker_symbol = row['Ticker']
-            # Fallback to 'Asset' (Ticker sheet) or 'Asset_Name' (Watchlist compatibility)
-            asset_name = row.get('Asset', row.get('Asset_Name', 'Unknown Asset'))
-            threshold = row.get('Dip_Threshold_Percent', DEFAULT_THRESHOLD)
-            
-            ticker_obj = yf.Ticker(ticker_symbol)
-            data = ticker_obj.history(start=one_year_ago, end=today)
-            
-            if data.empty: continue
-            clean_close = data['Close'].dropna()
-            if clean_close.empty: continue
-
-            high_52_week = data['High'].max()
-            current_price = clean_close.iloc[-1]
-            percent_from_high = ((current_price - high_52_week) / high_52_week) * 100
-            
-            if abs(percent_from_high) > threshold:
-                message = f"OPPORTUNITY: {asset_name} is {abs(percent_from_high):.1f}% below 52-week high."
-                st.info(f"**{message}**") 
-                insight_messages.append(message)
-            else:
-                message = f"OK: {asset_name} is {abs(percent_from_high):.1f}% below high."
-                st.success(f"**{message}**")
-                
-        except Exception as e:
-            st.error(f"Market Scout error for {row.get('Asset', 'Unknown')}: {e}")
+    symbols = set(ticker_df['Ticker'].astype(str).str.strip())
+    histories = {t: hist for t, hist in histories.items() if t in symbols}
+    if not histories:
+        return []
+    
+    # One column per ticker; the 52-week high and latest close come out of
+    # a single reduction over the whole watchlist.
+    prices = pd.concat(histories, axis=1)
+    high_52_week = prices.xs('High', level=1, axis=1).max()
+    current_price = prices.xs('Close', level=1, axis=1).ffill().iloc[-1]
+    percent_from_high = ((current_price - high_52_week) / high_52_week) * 100
+    
+    # Fallback to 'Asset' (Ticker sheet) or 'Asset_Name' (Watchlist compatibility)
+    name_col = 'Asset' if 'Asset' in ticker_df.columns else 'Asset_Name'
+    asset_names = ticker_df[name_col] if name_col in ticker_df.columns else pd.Series('Unknown Asset', index=ticker_df.index)
+    if 'Dip_Threshold_Percent' in ticker_df.columns:
+        thresholds = pd.to_numeric(ticker_df['Dip_Threshold_Percent'], errors='coerce').fillna(DEFAULT_THRESHOLD)
+    else:
+        thresholds = pd.Series(DEFAULT_THRESHOLD, index=ticker_df.index)
+    
+    row_tickers = ticker_df['Ticker'].astype(str).str.strip()
+    row_pct = row_tickers.map(percent_from_high)
+    is_opportunity = row_pct.abs() > thresholds
+    
+    # One table for the whole watchlist instead of a callout per ticker
+    results_df = pd.DataFrame({
+        'Asset': asset_names,
+        'Ticker': row_tickers,
+        'Below 52W High %': row_pct.abs(),
+        'Threshold %': thresholds,
+        'Status': np.where(is_opportunity, 'OPPORTUNITY', 'OK'),
+    }).dropna(subset=['Below 52W High %'])
+    
+    opportunities = results_df[results_df['Status'] == 'OPPORTUNITY']
+    insight_messages = (
+        "OPPORTUNITY: " + opportunities['Asset'].astype(str) + " is "
+        + opportunities['Below 52W High %'].map('{:.1f}'.format) + "% below 52-week high."
+    ).tolist()
+    
+    styled = results_df.style.format({'Below 52W High %': '{:.1f}', 'Threshold %': '{:.1f}'}).apply(
+        lambda status: np.where(status == 'OPPORTUNITY', 'background-color: rgba(28, 131, 225, 0.2)', ''),
+        subset=['Status']
+    )
+    st.dataframe(styled, hide_index=True, use_container_width=True)
             
     return insight_messages
 
-@st.cache_data(ttl=3600)
-def get_asset_performance(portfolio_df, ticker_df):
+# Yahoo's chart endpoint handles roughly 20 symbols per request
+YF_DOWNLOAD_CHUNK = 20
+
+def _download_history(tickers, **kwargs):
+    """
+    Downloads OHLC history for many tickers with batched yf.download calls
+    instead of one Ticker.history() request per symbol.
+    Returns a {ticker: DataFrame} dict; tickers with no data are left out.
+    """
+    import yfinance as yf
+
+    histories = {}
+    for start in range(0, len(tickers), YF_DOWNLOAD_CHUNK):
+        chunk = tickers[start:start + YF_DOWNLOAD_CHUNK]
+        data = yf.download(
+            tickers=" ".join(chunk), group_by='ticker', threads=True,
+            progress=False, auto_adjust=True, **kwargs
+        )
+        if data.empty:
+            continue
+        # Older yfinance versions return flat columns for a single symbol
+        if not isinstance(data.columns, pd.MultiIndex):
+            data = pd.concat({chunk[0]: data}, axis=1)
+        # Normalize the shared index once here rather than per asset downstream
+        if getattr(data.index, 'tz', None) is not None:
+            data.index = data.index.tz_localize(None)
+        # float32 is plenty for %-change maths and halves the cached footprint
+        data = data.astype({c: 'float32' for c in data.columns if data[c].dtype == 'float64'})
+        
+        downloaded = set(data.columns.get_level_values(0))
+        for ticker in chunk:
+            if ticker in downloaded:
+                hist = data[ticker].dropna(subset=['Close'])
+                if not hist.empty:
+                    histories[ticker] = hist
+    return histories
+
+@st.cache_resource(max_entries=512, show_spinner=False)
+def get_ticker(ticker_symbol):
+    """
+    Shared yf.Ticker per symbol, so the news, scout and performance paths reuse
+    one object (and its cookie/crumb handshake) instead of building their own.
+    Lives in st.cache_resource because an lru_cache on a module-level function is
+    rebuilt, and emptied, every time Streamlit re-executes this script.
+    """
+    import yfinance as yf
+
+    return yf.Ticker(ticker_symbol)
+
+# --- YFINANCE DISK CACHE ---
+# Survives app restarts, unlike st.cache_data. Prices only move once a day
+# for our purposes; headlines go stale much faster.
+YF_CACHE = get_file_cache()
+PRICE_CACHE_TTL = 24 * 60 * 60
+NEWS_CACHE_TTL = 60 * 60
+
+def cached_history(tickers, period):
+    """
+    Returns {ticker: history DataFrame}, reading each ticker from the disk cache
+    first and downloading only the misses in one batched call.
+    """
+    histories = {}
+    missing = []
+    params = {'period': period, 'date': dt.date.today().isoformat()}
+    for ticker in tickers:
+        hist = YF_CACHE.get(ticker, 'history', params, PRICE_CACHE_TTL)
+        if hist is None:
+            missing.append(ticker)
+        else:
+            histories[ticker] = hist
+    
+    if missing:
+        fetched = _download_history(missing, period=period)
+        for ticker, hist in fetched.items():
+            YF_CACHE.set(ticker, 'history', params, hist)
+        histories.update(fetched)
+    return histories
+
+def cached_news(ticker_symbol):
+    """Returns the yfinance news list for a ticker, cached on disk for an hour."""
+    news_list = YF_CACHE.get(ticker_symbol, 'news', {}, NEWS_CACHE_TTL)
+    if news_list is None:
+        news_list = get_ticker(ticker_symbol).news
+        if news_list:
+            YF_CACHE.set(ticker_symbol, 'news', {}, news_list)
+    return news_list
+
+def _attach_tickers(portfolio_df, ticker_df):
+    """
+    One row per distinct portfolio asset with its ticker from the 'Ticker' sheet,
+    joined on whitespace-stripped asset names ('' when unmapped).
+    """
+    assets = portfolio_df[['Asset']].drop_duplicates()
+    assets = assets.assign(_key=assets['Asset'].astype(str).str.strip())
+    tickers = pd.DataFrame({
+        '_key': ticker_df['Asset'].astype(str).str.strip(),
+        'Ticker': ticker_df['Ticker'].astype(str).str.strip(),
+    }).drop_duplicates('_key', keep='last')
+    merged = assets.merge(tickers, on='_key', how='left')
+    return merged.assign(Ticker=merged['Ticker'].fillna(''))
+
+@st.cache_resource(ttl=3600, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _price_history(tickers):
+    """1y history for a sorted tuple of symbols, cached on the symbols alone."""
+    try:
+        return cached_history(list(tickers), period='1y')
+    except Exception as e:
+        st.error(f"Error downloading market data: {e}")
+        return {}
+
+def load_price_history(ticker_df):
+    """
+    Fetches 1y history for every ticker in the 'Ticker' sheet once per render,
+    shared by the market scout and the performance snapshot.
+    Edits to other columns of the sheet (names, thresholds) keep the same cache entry.
+    """
+    if ticker_df.empty:
+        return {}
+    tickers = tuple(sorted({
+        t for t in ticker_df['Ticker'].astype(str).str.strip() if t and t.lower() != 'nan'
+    }))
+    return _price_history(tickers)
+
+PERFORMANCE_TIMEFRAMES = {
+    '1W %': 7,
+    '1M %': 30,
+    '3M %': 90,
+    '6M %': 180,
+    '1Y %': 365
+}
+PERFORMANCE_OFFSETS = np.array(list(PERFORMANCE_TIMEFRAMES.values()), dtype='timedelta64[D]')
+
+@st.cache_data(ttl=24 * 60 * 60, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def get_asset_performance(portfolio_df, ticker_df, histories):
     """
     Calculates percentage change using Date-Based Lookups.
+    `histories` is the {ticker: 1y history} dict prefetched by load_price_history.
     """
     performance_data = []
     
     if ticker_df.empty:
         return pd.DataFrame()
 
-    asset_to_ticker = dict(zip(
-        ticker_df['Asset'].astype(str).str.strip(), 
-        ticker_df['Ticker'].astype(str).str.strip()
-    ))
+    # Join the ticker map once instead of looking each asset up separately
+    asset_tickers = _attach_tickers(portfolio_df, ticker_df)
     
-    unique_assets = portfolio_df['Asset'].unique()
-    
-    for asset in unique_assets:
-        clean_asset = str(asset).strip()
-        ticker = asset_to_ticker.get(clean_asset)
-        
+    for rec in asset_tickers.itertuples(index=False):
+        asset, ticker = rec.Asset, rec.Ticker
         row_data = {
             'Asset': asset,
             'Ticker': ticker if ticker else "Not Found",
@@ -397,38 +912,27 @@ def get_asset_performance(portfolio_df, ticker_df):
             '3M %': 'NA', '6M %': 'NA', '1Y %': 'NA'
         }
         
-        if ticker and ticker.lower() != 'nan' and ticker != '':
+        hist = histories.get(ticker)
+        if hist is not None:
             try:
-                t = yf.Ticker(ticker)
-                hist = t.history(period='1y') 
-                
-                if not hist.empty and len(hist) > 1:
-                    hist.index = pd.to_datetime(hist.index).tz_localize(None)
-                    current_price = hist['Close'].iloc[-1]
-                    current_date = hist.index[-1]
+                if len(hist) > 1:
+                    # The download path already gives a sorted, tz-naive index
+                    index_values = hist.index.values
+                    close_values = hist['Close'].to_numpy()
+                    current_price = close_values[-1]
                     
-                    prev_close = hist['Close'].iloc[-2]
+                    prev_close = close_values[-2]
                     change_1d = ((current_price - prev_close) / prev_close) * 100
                     row_data['1D %'] = f"{change_1d:+.2f}%"
-
-                    timeframes = {
-                        '1W %': 7,
-                        '1M %': 30,
-                        '3M %': 90,
-                        '6M %': 180,
-                        '1Y %': 365
-                    }
                     
-                    for label, days_back in timeframes.items():
-                        target_date = current_date - dt.timedelta(days=days_back)
-                        past_data = hist[hist.index <= target_date]
-                        
-                        if not past_data.empty:
-                            ref_price = past_data['Close'].iloc[-1]
-                            pct_change = ((current_price - ref_price) / ref_price) * 100
-                            row_data[label] = f"{pct_change:+.2f}%"
-                        else:
-                            row_data[label] = "NA" 
+                    # Locate the last close on/before every target date with one binary search
+                    target_dates = index_values[-1] - PERFORMANCE_OFFSETS
+                    positions = np.searchsorted(index_values, target_dates, side='right') - 1
+                    ref_prices = close_values[np.clip(positions, 0, None)]
+                    pct_changes = ((current_price - ref_prices) / ref_prices) * 100
+                    
+                    for label, pos, pct_change in zip(PERFORMANCE_TIMEFRAMES, positions, pct_changes):
+                        row_data[label] = f"{pct_change:+.2f}%" if pos >= 0 else "NA"
 
             except Exception as e:
                 print(f"Error fetching data for {asset}: {e}")
@@ -437,85 +941,167 @@ def get_asset_performance(portfolio_df, ticker_df):
         
     return pd.DataFrame(performance_data)
 
+# --- CHARTS ---
+
+@st.cache_data(ttl=600, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def build_asset_pie(portfolio_df):
+    """Allocation pie by asset; the whole Figure is cached so reruns skip the rebuild."""
+    import plotly.graph_objects as go
+
+    # A bare go.Pie skips plotly-express's long-form DataFrame and colour-mapping pass
+    return go.Figure(
+        go.Pie(labels=portfolio_df['Asset'], values=portfolio_df['Current_Value'], hole=0.3),
+        layout={'title': 'By Asset'}
+    )
+
+@st.cache_data(ttl=600, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def build_category_pie(category_df, rules_df):
+    """Allocation pie by category, with each category's target percentage in the hover text."""
+    import plotly.graph_objects as go
+
+    pie_df = category_df.assign(Target_Percentage=0)
+    if not rules_df.empty:
+        pie_df = pd.merge(category_df, rules_df[['Category', 'Target_Percentage']], on='Category', how='left')
+        pie_df['Target_Percentage'] = pie_df['Target_Percentage'].fillna(0)
+    
+    return go.Figure(
+        go.Pie(
+            labels=pie_df['Category'],
+            values=pie_df['Current_Value'],
+            customdata=pie_df[['Target_Percentage']],
+            hole=0.3,
+            hovertemplate="<b>%{label}</b><br>Value: %{value}<br>Current: %{percent}<br>Target: %{customdata[0]}%<extra></extra>"
+        ),
+        layout={'title': 'By Category'}
+    )
+
 # --- DASHBOARD RENDERER ---
 
-def render_dashboard_tab(gsheet_client, gdoc_service):
+@st.fragment
+def render_portfolio_allocation(portfolio_df, category_df, rules_df, total_value):
+    """
+    Allocation pies and holdings table. As a fragment, interactions inside this
+    section rerun only this function, not the loaders and insight checks above it.
+    """
+    st.header("💰 Current Portfolio Allocation (Based on Invested Value)")
+    if portfolio_df.empty:
+        return
+    st.subheader(f"Total Invested Value: Rs {total_value:,.2f}")
+    col1, col2 = st.columns(2)
+    
+    # The asset pie is display-only; the category pie keeps hover for its target percentages
+    with col1:
+        st.plotly_chart(
+            build_asset_pie(portfolio_df), use_container_width=True,
+            config={'staticPlot': True, 'displayModeBar': False}
+        )
+        
+    with col2:
+        st.plotly_chart(
+            build_category_pie(category_df, rules_df), use_container_width=True,
+            config={'displayModeBar': False}
+        )
+        
+    # Ship only the displayed columns; height caps the rendered viewport for long portfolios
+    display_df = portfolio_df[['Asset', 'Category', 'Current_Value']].rename(columns={'Current_Value': 'Invested_Value'})
+    st.dataframe(display_df, hide_index=True, use_container_width=True, height=400)
+
+# Matches the price-history TTL, so each refresh picks up a fresh download
+MARKET_REFRESH_INTERVAL = "1h"
+
+@st.fragment(run_every=MARKET_REFRESH_INTERVAL)
+def render_market_scout(ticker_map_df):
+    """
+    Market scout and news sentiment as one fragment. They refresh on their own timer
+    without rerunning the sheet loads, rebalance check or charts of the full dashboard.
+    Results are left in st.session_state for the summary and the performance table.
+    """
+    with st.spinner("Scouting market for opportunities..."):
+        # One batched price download feeds both the scout and the performance table
+        price_histories = load_price_history(ticker_map_df)
+        market_insights = check_market_dips(ticker_map_df, price_histories)
+    
+    with st.spinner("Analyzing news sentiment..."):
+        news_insights = analyze_market_news(ticker_map_df)
+    
+    st.session_state['price_histories'] = price_histories
+    st.session_state['market_insights'] = market_insights
+    st.session_state['news_insights'] = news_insights
+
+def render_dashboard_tab(sheets_service, gdoc_service):
     st.title("🤖 Personal Finance Agent Dashboard")
     
     with st.spinner("Loading and aggregating transaction data..."):
-        portfolio_df = load_portfolio(gsheet_client, G_SHEET_NAME)
-        rules_df = load_rules_from_sheet(gsheet_client, G_SHEET_NAME)
-        watchlist_df = load_watchlist(gsheet_client, G_SHEET_NAME) 
-        ticker_map_df = load_ticker_map(gsheet_client, G_SHEET_NAME) 
+        # Resolved once per process and used as the loaders' hashable key
+        try:
+            spreadsheet_id = get_spreadsheet_id(G_SHEET_NAME)
+        except Exception as e:
+            st.error(f"Error looking up spreadsheet '{G_SHEET_NAME}': {e}")
+            spreadsheet_id = None
+        
+        def load_sheets_api_tabs():
+            # All four read the same cached batchGet, so they share one thread
+            return (
+                load_portfolio(sheets_service, spreadsheet_id),
+                load_rules_from_sheet(sheets_service, spreadsheet_id),
+                load_watchlist(sheets_service, spreadsheet_id),
+                load_ticker_map(sheets_service, spreadsheet_id),
+            )
+        
+        # The sheet tabs and the Doc are independent and network-bound, so fetch them concurrently.
+        # Each service keeps its own HTTP connection, which is never shared across threads.
+        # Workers get the script context so the loaders can still report errors with st.error.
+        with ThreadPoolExecutor(
+            max_workers=2, initializer=add_script_run_ctx, initargs=(None, get_script_run_ctx())
+        ) as executor:
+            sheets_future = executor.submit(load_sheets_api_tabs)
+            doc_future = executor.submit(load_rules_from_doc, gdoc_service, G_DOC_ID)
+            portfolio_df, rules_df, watchlist_df, ticker_map_df = sheets_future.result()
+            rules_text = doc_future.result()
     
     rebalance_insights = []
     market_insights = []
     news_insights = [] 
     
+    # Shared by the rebalance check and the category pie chart
+    category_df, total_value = pd.DataFrame(), 0
+    if not portfolio_df.empty:
+        category_df, total_value = summarize_portfolio(portfolio_df)
+    
     if not portfolio_df.empty and not rules_df.empty:
-        rebalance_insights = generate_rebalance_insights(portfolio_df, rules_df)
+        rebalance_insights = generate_rebalance_insights(portfolio_df, rules_df, category_df=category_df)
         
     # --- UPDATED: Pass Ticker Map for Scout ---
+    price_histories = {}
     if not ticker_map_df.empty:
-        with st.spinner("Scouting market for opportunities..."):
-            market_insights = check_market_dips(ticker_map_df) 
-        
-        with st.spinner("Analyzing news sentiment..."):
-            news_insights = analyze_market_news(ticker_map_df)
+        render_market_scout(ticker_map_df)
+        price_histories = st.session_state.get('price_histories', {})
+        market_insights = st.session_state.get('market_insights', [])
+        news_insights = st.session_state.get('news_insights', [])
     
     st.divider()
     st.header("💡 Agent's Combined Summary")
+    # Reserve the slot now; Groq works in the background while the charts below render
+    summary_slot = st.empty()
+    pending_summary = None
     if rebalance_insights or market_insights or news_insights: 
-        with st.spinner("Generating AI summary..."):
-            summary = get_llm_summary(rebalance_insights, market_insights, news_insights) 
-            if summary:
-                st.info(f"**{summary}**")
+        pending_summary = start_llm_summary(rebalance_insights, market_insights, news_insights)
+        summary_slot.caption("Generating AI summary...")
     else:
-        st.success("All systems normal. No new alerts.")
+        summary_slot.success("All systems normal. No new alerts.")
     
     st.divider()
     
-    st.header("💰 Current Portfolio Allocation (Based on Invested Value)")
+    render_portfolio_allocation(portfolio_df, category_df, rules_df, total_value)
+    
     if not portfolio_df.empty:
-        total_value = portfolio_df['Current_Value'].sum()
-        st.subheader(f"Total Invested Value: Rs {total_value:,.2f}")
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            fig_asset = px.pie(portfolio_df, names='Asset', values='Current_Value', title='By Asset', hole=0.3)
-            st.plotly_chart(fig_asset, use_container_width=True)
-            
-        with col2:
-            category_df = portfolio_df.groupby('Category')['Current_Value'].sum().reset_index()
-            
-            if not rules_df.empty:
-                category_df = pd.merge(category_df, rules_df[['Category', 'Target_Percentage']], on='Category', how='left')
-                category_df['Target_Percentage'] = category_df['Target_Percentage'].fillna(0)
-            
-            fig_category = px.pie(
-                category_df, 
-                names='Category', 
-                values='Current_Value', 
-                title='By Category', 
-                hole=0.3,
-                hover_data=['Target_Percentage'] 
-            )
-            fig_category.update_traces(
-                hovertemplate="<b>%{label}</b><br>Value: %{value}<br>Current: %{percent}<br>Target: %{customdata[0]}%"
-            )
-            st.plotly_chart(fig_category, use_container_width=True)
-            
-        display_df = portfolio_df.copy()
-        display_df.rename(columns={'Current_Value': 'Invested_Value'}, inplace=True)
-        st.dataframe(display_df, hide_index=True)
-
         if not ticker_map_df.empty:
             st.divider()
             st.header("🚀 Market Performance Snapshot")
             st.markdown("Percentage change calculated using 'Ticker' sheet mapping.")
             
             with st.spinner("Calculating market performance metrics..."):
-                perf_df = get_asset_performance(portfolio_df, ticker_map_df) 
+                perf_df = get_asset_performance(portfolio_df, ticker_map_df, price_histories) 
                 if not perf_df.empty:
                     st.dataframe(perf_df, hide_index=True)
         elif not watchlist_df.empty:
@@ -523,28 +1109,60 @@ def render_dashboard_tab(gsheet_client, gdoc_service):
 
     st.divider()
     st.header("📜 My Investment Principles")
-    with st.spinner("Loading principles..."):
-        rules_text = load_rules_from_doc(gdoc_service, G_DOC_ID) 
-        if rules_text:
-            st.markdown(rules_text)
+    if rules_text:
+        st.markdown(rules_text)
+    
+    if pending_summary is not None:
+        render_llm_summary(summary_slot, pending_summary)
+
+# --- CACHE STATS ---
+
+def render_cache_stats():
+    """Sidebar panel showing how much memory each st.cache_data function holds."""
+    with st.sidebar.expander("Cache stats"):
+        try:
+            # Streamlit only exposes cache sizes through its runtime stats provider
+            from streamlit.runtime.caching.cache_data_api import _data_caches
+            stats = _data_caches.get_stats()
+            # Newer Streamlit versions group the stats by family in a dict
+            if isinstance(stats, dict):
+                stats = [stat for family in stats.values() for stat in family]
+            stats_df = pd.DataFrame({
+                'Function': [stat.cache_name for stat in stats],
+                'Bytes': [stat.byte_length for stat in stats],
+            })
+        except Exception as e:
+            st.caption(f"Cache stats unavailable: {e}")
+            return
+        
+        if stats_df.empty:
+            st.caption("No cached entries yet.")
+            return
+        
+        summary_df = stats_df.groupby('Function', as_index=False).agg(
+            Entries=('Bytes', 'size'), Size_KB=('Bytes', 'sum')
+        )
+        summary_df['Size_KB'] = summary_df['Size_KB'] / 1024
+        st.dataframe(summary_df.sort_values('Size_KB', ascending=False), hide_index=True)
 
 # --- MAIN ---
 
 def main():
-    gsheet_client = get_gsheet_client()
+    sheets_service = get_sheets_service()
     gdoc_service = get_gdoc_service()
 
     st.sidebar.title("Agent Control")
     st.sidebar.info("Runs daily at 9 AM IST.")
+    render_cache_stats()
     
-    if gsheet_client is None and gdoc_service is None:
+    if sheets_service is None and gdoc_service is None:
         st.error("FATAL ERROR: Client initialization failed.")
         return
 
     tab1, tab2 = st.tabs(["📊 Dashboard & Alerts", "💬 Advisor Chat"])
     
     with tab1:
-        render_dashboard_tab(gsheet_client, gdoc_service)
+        render_dashboard_tab(sheets_service, gdoc_service)
     
     with tab2:
         render_chat_tab()
@@ -1,19 +1,74 @@
 import streamlit as st
-import os
-from groq import Groq
-import json
+import hashlib
+import re
+
+from disk_cache import BoundedStore
 
 # --- Groq Chat Function ---
 
+@st.cache_resource
+def get_chat_client():
+    """Groq client shared across chat turns, so each reply reuses the pooled connection."""
+    from groq import Groq
+
+    return Groq(api_key=st.secrets["GROQ_API_KEY"])
+
+CHAT_CACHE_MAX_ENTRIES = 500
+# Only the latest turns go to the model, so a long chat doesn't resend its whole
+# transcript every turn; the UI still shows the full history
+CHAT_HISTORY_MAX_MESSAGES = 16
+CHAT_HISTORY_MAX_WORDS = 1500
+
+@st.cache_resource
+def _reply_store():
+    """
+    Process-wide {question key: reply} map for opening questions, shared by all sessions.
+    Only first questions are stored; later turns depend on the conversation so far.
+    """
+    return BoundedStore(CHAT_CACHE_MAX_ENTRIES)
+
+def _question_key(prompt):
+    """Digest of the prompt's words, ignoring case, punctuation and spacing."""
+    normalized = " ".join(re.findall(r"\w+", prompt.casefold()))
+    return hashlib.blake2b(normalized.encode(), digest_size=16).hexdigest()
+
+def _stream_text(stream, cache_key=None):
+    """
+    Yields the text of each completion chunk; a dropped connection ends the reply with a note.
+    A reply that finishes cleanly is stored under `cache_key`, if one is given.
+    """
+    parts = []
+    try:
+        for chunk in stream:
+            text = chunk.choices[0].delta.content or ""
+            parts.append(text)
+            yield text
+    except Exception as e:
+        yield f"\n\nError communicating with the LLM: {e}"
+        return
+    
+    reply = "".join(parts)
+    if cache_key and reply:
+        _reply_store()[cache_key] = reply
+
 def get_chat_response(prompt, history):
     """
     Calls the Groq API to get a response, using history for context.
+    Returns a generator of reply text as it is generated, or an error string.
     """
     if 'GROQ_API_KEY' not in st.secrets:
         return "The Groq API key is missing. Please check your Streamlit secrets."
         
+    # An opening question has no conversation to depend on, so a repeat of one
+    # (in any session) is answered from the store instead of calling Groq again
+    is_opening_question = sum(msg["role"] == "user" for msg in history) <= 1
+    cache_key = _question_key(prompt) if is_opening_question else None
+    stored_reply = _reply_store().get(cache_key) if cache_key else None
+    if stored_reply is not None:
+        return stored_reply
+    
     try:
-        client = Groq(api_key=st.secrets["GROQ_API_KEY"])
+        client = get_chat_client()
         
         # System instructions to define the chatbot's persona
         system_instruction = (
@@ -26,8 +81,16 @@ def get_chat_response(prompt, history):
         # Convert Streamlit history format to Groq API message format
         messages = [{"role": "system", "content": system_instruction}]
         
-        # Add past conversation history
-        for msg in history:
+        # The caller has usually appended the current prompt to history already
+        if history and history[-1]["role"] == "user" and history[-1]["content"] == prompt:
+            history = history[:-1]
+        
+        # Add recent conversation history, dropping the oldest turns beyond the word budget
+        recent = history[-CHAT_HISTORY_MAX_MESSAGES:]
+        word_counts = [len(msg["content"].split()) for msg in recent]
+        while recent and sum(word_counts) > CHAT_HISTORY_MAX_WORDS:
+            recent, word_counts = recent[1:], word_counts[1:]
+        for msg in recent:
             role = "assistant" if msg["role"] == "assistant" else "user"
             messages.append({"role": role, "content": msg["content"]})
         
@@ -38,9 +101,10 @@ def get_chat_response(prompt, history):
             messages=messages,
             model="llama-3.1-8b-instant",
             temperature=0.8,
+            stream=True,
         )
         
-        return chat_completion.choices[0].message.content
+        return _stream_text(chat_completion, cache_key)
         
     except Exception as e:
         return f"Error communicating with the LLM: {e}"
@@ -73,11 +137,15 @@ def render_chat_tab():
         # 2. Get and display assistant response
         with st.chat_message("assistant"):
             with st.spinner("Finance Bot is thinking..."):
-                # Call Groq API
-                response = get_chat_response(prompt, st.session_state.messages)
+                # Call Groq API; returns as soon as the first tokens are on their way
+                reply = get_chat_response(prompt, st.session_state.messages)
             
-            # Write response to the chat
-            st.write(response)
+            # Write response to the chat token by token
+            if isinstance(reply, str):
+                st.write(reply)
+                response = reply
+            else:
+                response = st.write_stream(reply)
             
             # 3. Store assistant response
             st.session_state.messages.append({"role": "assistant", "content": response})
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+import time
+
+# --- Bounded In-Memory Store ---
+
+class BoundedStore:
+    """
+    Thread-safe dict that keeps at most `max_entries` items, dropping the oldest first.
+    Setting an existing key makes it the newest again.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._items = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._items.get(key, default)
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._items.pop(key, None)
+            self._items[key] = value
+            while len(self._items) > self.max_entries:
+                self._items.pop(next(iter(self._items)))
+
+# --- On-disk TTL Cache ---
+
+class FileCache:
+    """
+    Small pickle-based cache that survives process restarts.
+    Each entry is stored as .cache/<namespace>/<endpoint>_<params_md5>.pkl with a
+    JSON sidecar holding the time it was fetched, so every caller can choose its own TTL.
+    Fresh entries are also kept in memory (up to `memory_entries`), so a long-lived
+    instance serves repeat reads without touching the disk. Values handed out from
+    memory are shared, so callers must treat them as read-only.
+    """
+
+    def __init__(self, root='.cache', memory_entries=256):
+        self.root = root
+        # data path -> (fetched_at, value), shared by every thread using this instance
+        self._memory = BoundedStore(memory_entries)
+
+    def _paths(self, namespace, endpoint, params):
+        params_md5 = hashlib.md5(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+        folder = os.path.join(self.root, str(namespace).replace(os.sep, '_'))
+        base = os.path.join(folder, f"{endpoint}_{params_md5}")
+        return folder, base + '.pkl', base + '.json'
+
+    def get(self, namespace, endpoint, params, ttl):
+        """Returns the cached value, or None if it is missing, unreadable or older than `ttl` seconds."""
+        _, data_path, meta_path = self._paths(namespace, endpoint, params)
+        entry = self._memory.get(data_path)
+        if entry is not None and time.time() - entry[0] < ttl:
+            return entry[1]
+        try:
+            with open(meta_path) as f:
+                fetched_at = json.load(f)['fetched_at']
+            if time.time() - fetched_at >= ttl:
+                return None
+            with open(data_path, 'rb') as f:
+                value = pickle.load(f)
+        except (OSError, ValueError, KeyError, pickle.UnpicklingError, EOFError):
+            return None
+        self._memory[data_path] = (fetched_at, value)
+        return value
+
+    def set(self, namespace, endpoint, params, value):
+        """Stores `value`; a failed write only costs a cache miss next time."""
+        folder, data_path, meta_path = self._paths(namespace, endpoint, params)
+        self._memory[data_path] = (time.time(), value)
+        try:
+            os.makedirs(folder, exist_ok=True)
+            # Write to a temp file first so concurrent readers never see a partial pickle
+            self._atomic_write(folder, data_path, pickle.dumps(value))
+            self._atomic_write(folder, meta_path, json.dumps({'fetched_at': time.time()}).encode())
+        except OSError as e:
+            print(f"Could not write cache entry {data_path}: {e}")
+
+    @staticmethod
+    def _atomic_write(folder, path, payload):
+        fd, tmp_path = tempfile.mkstemp(dir=folder)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
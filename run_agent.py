@@ -2,18 +2,18 @@
 # This script is NOT a Streamlit app. It's a simple Python script
 # designed to be run on a schedule (e.g., by GitHub Actions).
 
-import gspread
 import pandas as pd
-from googleapiclient.discovery import build
+import numpy as np
 from google.oauth2 import service_account
 import os
-from groq import Groq
-import yfinance as yf
 import datetime as dt
-from twilio.rest import Client 
 import sys 
 import json 
-import time # Added for safety (delaying API calls)
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from disk_cache import FileCache
+# gspread, googleapiclient, groq, yfinance and twilio are imported where they are
+# used, so a run that stops early (no insights, missing data) never loads them all.
 
 # --- Load Secrets from Environment Variables ---
 try:
@@ -30,6 +30,9 @@ try:
     # Groq Credentials
     groq_api_key = os.environ['GROQ_API_KEY']
     
+    # Optional: the spreadsheet's ID, which saves a Drive search by title on every run
+    gsheet_key = os.environ.get('GSHEET_KEY') or None
+    
 except KeyError as e:
     print(f"CRITICAL ERROR: Environment variable {e} not set.")
     print("Please set all required secrets in your GitHub Actions settings.")
@@ -41,52 +44,128 @@ SCOPES_SHEETS = [
     'https://www.googleapis.com/auth/drive'
 ]
 
+@functools.lru_cache(maxsize=None)
+def get_creds():
+    """Service-account credentials shared by gspread and Drive, so the run fetches one access token."""
+    return service_account.Credentials.from_service_account_info(google_creds_dict, scopes=SCOPES_SHEETS)
+
 def get_gsheet_client():
     """Connect to Google Sheets API."""
     try:
-        creds = gspread.service_account_from_dict(google_creds_dict, scopes=SCOPES_SHEETS)
-        return creds
+        import gspread
+
+        return gspread.authorize(get_creds())
     except Exception as e:
         print(f"An error occurred connecting to Google Sheets: {e}")
         return None
 
+@functools.lru_cache(maxsize=None)
+def get_drive_service():
+    """Drive v3 service for the spreadsheet's ID and modifiedTime lookup."""
+    try:
+        from googleapiclient.discovery import build
+
+        return build('drive', 'v3', credentials=get_creds(), static_discovery=True, cache_discovery=False)
+    except Exception as e:
+        print(f"An error occurred connecting to Google Drive: {e}")
+        return None
+
 # --- LLM "Communicator" Function (UPDATED for News) ---
+@functools.lru_cache(maxsize=None)
+def get_groq_client():
+    """One Groq client per run, so the summary and news calls share its HTTPS connections."""
+    from groq import Groq
+
+    return Groq(api_key=groq_api_key)
+
+SUMMARY_MODEL = "llama-3.1-8b-instant"
+# Output tokens dominate latency; a WhatsApp-sized paragraph fits well within this
+SUMMARY_MAX_TOKENS = 256
+# Sheet values and summaries reveal the portfolio, so they live outside .cache, which the
+# workflow saves to the Actions cache. Each Actions run starts on a fresh runner, so
+# these caches are always cold there; they only help repeated runs on the same machine.
+PRIVATE_CACHE_DIR = '.private_cache'
+# The summary is generated at temperature 0, so identical insights give an identical
+# message; a local run whose insights match a recent one reuses it instead of calling
+# Groq. Scheduled Actions runs never see a previous summary (see PRIVATE_CACHE_DIR).
+LLM_CACHE = FileCache(PRIVATE_CACHE_DIR)
+SUMMARY_CACHE_TTL = 7 * 24 * 60 * 60
+SUMMARY_SIGN_OFF = "- Your Finance Agent"
+# System prompts are fixed strings with all per-run data in the user message,
+# so Groq can reuse the cached prompt prefix between calls
+SUMMARY_SYSTEM_PROMPT = (
+    "You are a concise and clear-spoken personal finance assistant. "
+    "I will give you three lists of alerts: 1) Internal Portfolio Alerts (rebalancing needs), "
+    "2) External Market Opportunities (assets on sale), and 3) Recent News Sentiment. "
+    "Your job is to summarize them in a single, professional, and actionable paragraph. "
+    "Prioritize ALERTs and OPPORTUNITIEs first. Then mention significant news (Positive/Negative). "
+    "Be brief. This is for a WhatsApp message. Use newlines for readability. "
+    f"Sign off with '{SUMMARY_SIGN_OFF}'."
+)
+NEWS_SYSTEM_PROMPT = (
+    "You are a financial news summarizer. A user is asking for sentiment analysis on the numbered assets below "
+    "based on the latest news articles provided via Google Search results. "
+    "For every numbered asset, in the same order, output exactly one concise line in this format: "
+    "SENTIMENT: [Asset Name] is [Sentiment: POSITIVE/NEGATIVE/NEUTRAL] due to [Specific reason, max 10 words]."
+)
+
+def _log_prompt_cache(label, completion):
+    """Prints how much of the prompt Groq served from its prefix cache, when the model reports it."""
+    usage = getattr(completion, 'usage', None)
+    details = getattr(usage, 'prompt_tokens_details', None)
+    cached_tokens = getattr(details, 'cached_tokens', None)
+    if cached_tokens is not None and usage.prompt_tokens:
+        print(f"  > {label}: {cached_tokens}/{usage.prompt_tokens} prompt tokens served from cache "
+              f"({cached_tokens / usage.prompt_tokens:.0%}).")
+
 def get_llm_summary(rebalance_insights, market_insights, news_insights):
     """
     Takes lists of all insights and gets a single human-friendly summary from Groq.
     """
     if not rebalance_insights and not market_insights and not news_insights:
         return "No specific insights to summarize today. All systems normal."
+    
+    # A lone insight is already a readable sentence; there is nothing for Groq to condense
+    all_insights = [*rebalance_insights, *market_insights, *news_insights]
+    if len(all_insights) == 1:
+        return f"{all_insights[0]}\n\n{SUMMARY_SIGN_OFF}"
         
     try:
-        client = Groq(api_key=groq_api_key) 
+        client = get_groq_client()
         
-        insights_text = "Internal Portfolio Alerts:\n" + "\n".join(rebalance_insights)
-        insights_text += "\n\nExternal Market Opportunities:\n" + "\n".join(market_insights)
-        insights_text += "\n\nRecent News Sentiment:\n" + "\n".join(news_insights)
+        # Assemble the whole prompt in one join rather than copying it on every concatenation
+        user_prompt = "\n".join([
+            "Here are today's portfolio alerts:",
+            "Internal Portfolio Alerts:", *rebalance_insights, "",
+            "External Market Opportunities:", *market_insights, "",
+            "Recent News Sentiment:", *news_insights,
+        ])
         
-        system_prompt = (
-            "You are a concise and clear-spoken personal finance assistant. "
-            "I will give you three lists of alerts: 1) Internal Portfolio Alerts (rebalancing needs), "
-            "2) External Market Opportunities (assets on sale), and 3) Recent News Sentiment. "
-            "Your job is to summarize them in a single, professional, and actionable paragraph. "
-            "Prioritize ALERTs and OPPORTUNITIEs first. Then mention significant news (Positive/Negative). "
-            "Be brief. This is for a WhatsApp message. Use newlines for readability. "
-            "Sign off with '- Your Finance Agent'."
-        )
-        
-        user_prompt = f"Here are today's portfolio alerts:\n{insights_text}"
+        # The cache key covers everything that shapes the reply
+        cache_params = {
+            'model': SUMMARY_MODEL, 'max_tokens': SUMMARY_MAX_TOKENS,
+            'system': SUMMARY_SYSTEM_PROMPT, 'user': user_prompt,
+        }
+        summary = LLM_CACHE.get('groq', 'summary', cache_params, SUMMARY_CACHE_TTL)
+        if summary is not None:
+            print("Insights unchanged since a recent run; reusing its summary.")
+            return summary
         
         chat_completion = client.chat.completions.create(
             messages=[
-                {"role": "system", "content": system_prompt},
+                {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
                 {"role": "user", "content": user_prompt}
             ],
-            model="llama-3.1-8b-instant",
-            temperature=0.7,
+            model=SUMMARY_MODEL,
+            max_tokens=SUMMARY_MAX_TOKENS,
+            temperature=0.0,
         )
         
-        return chat_completion.choices[0].message.content
+        _log_prompt_cache("Summary", chat_completion)
+        summary = chat_completion.choices[0].message.content
+        if summary:
+            LLM_CACHE.set('groq', 'summary', cache_params, summary)
+        return summary
         
     except Exception as e:
         print(f"Error connecting to Groq API: {e}")
@@ -94,87 +173,179 @@ def get_llm_summary(rebalance_insights, market_insights, news_insights):
 
 # --- NEW: News Analysis Function ---
 
-def analyze_market_news(watchlist_df, groq_api_key):
+def _parse_sentiments(content, asset_names):
+    """
+    Matches a batched reply's SENTIMENT lines to `asset_names`, in order. Each line must name
+    its asset, so a skipped asset gets None instead of shifting its neighbours' answers.
+    """
+    # Drop any "1)" style numbering the model puts in front of each line
+    lines = [line[line.find("SENTIMENT:"):].strip() for line in content.splitlines() if "SENTIMENT:" in line]
+    sentiments, position = [], 0
+    for asset_name in asset_names:
+        name = str(asset_name).lower()
+        match = next((i for i in range(position, len(lines)) if name in lines[i].lower()), None)
+        if match is None:
+            sentiments.append(None)
+            continue
+        sentiments.append(lines[match])
+        position = match + 1
+    return sentiments
+
+def analyze_market_news(watchlist_df):
     """
     Simulates fetching relevant news for each ticker and uses Groq to generate a sentiment insight.
+    All watchlist assets are marshaled into one numbered prompt, so the run makes a single
+    Groq request (and pays the prompt prefill once) instead of one request per row.
     """
-    news_insights = []
+    if watchlist_df.empty:
+        return []
     
-    # We will iterate through each watchlist asset and search for recent news.
-    for index, row in watchlist_df.iterrows():
-        ticker = row['Ticker']
-        asset_name = row['Asset_Name']
-        
-        # 1. Simulate Google Search (Using the search tool for live results)
-        # Note: The actual tool call is handled by the Gemini backend, 
-        # so here we format the prompt correctly for Groq to receive the search data.
-        
-        search_query = f"Latest 24 hours news and analyst reports for {asset_name} ({ticker})"
-        
-        # This function definition relies on the LLM performing a grounded search.
-        # We will wrap the Groq call to analyze the search results.
+    assets = list(watchlist_df[['Asset_Name', 'Ticker']].itertuples(index=False, name=None))
+    
+    # Each numbered line is one search query; the model answers one SENTIMENT line per query, in order.
+    search_queries = "\n".join(
+        f"{i}) Latest 24 hours news and analyst reports for {asset_name} ({ticker})"
+        for i, (asset_name, ticker) in enumerate(assets, start=1)
+    )
+    
+    try:
+        client = get_groq_client()
         
-        try:
-            client = Groq(api_key=groq_api_key)
-            
-            system_prompt = (
-                f"You are a financial news summarizer. A user is asking for sentiment analysis on {asset_name} ({ticker}) "
-                f"based on the latest news articles provided via Google Search results. "
-                f"Your output must be a single, concise sentence in this format: "
-                f"SENTIMENT: [Asset Name] is [Sentiment: POSITIVE/NEGATIVE/NEUTRAL] due to [Specific reason, max 10 words]."
-            )
-
-            # Use the search tool through Groq
-            chat_completion = client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": search_query}
-                ],
-                model="llama-3.1-8b-instant",
-                temperature=0.5,
-                tools=[{"google_search": {}}] # Enable Google Search Grounding
-            )
-            
-            # Extract and clean the sentiment summary
-            sentiment_summary = chat_completion.choices[0].message.content.strip()
-            
-            if sentiment_summary.startswith("SENTIMENT:"):
-                news_insights.append(sentiment_summary)
-            else:
-                news_insights.append(f"NEWS: Could not determine clear sentiment for {asset_name}.")
-
-            print(f"  > News Analysis for {asset_name}: {sentiment_summary}")
-            
-            # Introduce a small delay to avoid hitting API rate limits for rapid consecutive calls
-            time.sleep(1) 
-            
-        except Exception as e:
-            print(f"Error during news sentiment analysis for {asset_name}: {e}")
-            news_insights.append(f"NEWS: Failed to analyze recent news for {asset_name}.")
+        # Use the search tool through Groq
+        chat_completion = client.chat.completions.create(
+            messages=[
+                {"role": "system", "content": NEWS_SYSTEM_PROMPT},
+                {"role": "user", "content": search_queries}
+            ],
+            model="llama-3.1-8b-instant",
+            # Labelling sentiment is a classification task, so keep it deterministic
+            temperature=0.0,
+            tools=[{"google_search": {}}] # Enable Google Search Grounding
+        )
+        _log_prompt_cache("News", chat_completion)
+        content = chat_completion.choices[0].message.content or ""
+    except Exception as e:
+        print(f"Error during news sentiment analysis: {e}")
+        return [f"NEWS: Failed to analyze recent news for {asset_name}." for asset_name, _ in assets]
+    
+    sentiments = _parse_sentiments(content, [asset_name for asset_name, _ in assets])
+    
+    news_insights = []
+    for (asset_name, _), sentiment_summary in zip(assets, sentiments):
+        if sentiment_summary:
+            news_insights.append(sentiment_summary)
+        else:
+            news_insights.append(f"NEWS: Could not determine clear sentiment for {asset_name}.")
+        print(f"  > News Analysis for {asset_name}: {sentiment_summary}")
             
     return news_insights
 
 
 # --- DATA LOADING (Unchanged) ---
-# (load_portfolio, load_rules_from_sheet, load_watchlist functions remain the same as in app.py)
-def load_portfolio(_client, sheet_name):
-    if not _client: return pd.DataFrame()
+# (load_portfolio, load_rules_from_sheet, load_watchlist parse the tabs fetched by load_all_sheets)
+def _values_to_frame(rows):
+    """Builds a DataFrame from a header row plus data rows, padding short rows with ''."""
+    if not rows:
+        return pd.DataFrame()
+    header = rows[0]
+    df = pd.DataFrame(rows[1:]).reindex(columns=range(len(header))).fillna('')
+    df.columns = header
+    return df
+
+SHEET_TABS = ['Portfolio', 'Rules']
+# Also fetched in the same request, but the sheet may not have them
+OPTIONAL_SHEET_TABS = ['Watchlist']
+# Local runs only (see PRIVATE_CACHE_DIR); scheduled runs always read the sheet
+SHEET_CACHE = FileCache(PRIVATE_CACHE_DIR)
+# Entries are keyed by the spreadsheet's modifiedTime, so they only go stale when the sheet is edited
+UNCHANGED_SHEET_TTL = 7 * 24 * 60 * 60
+
+def _find_spreadsheet(drive, sheet_name):
+    """Returns (spreadsheet_id, modifiedTime) for the named spreadsheet from one Drive query."""
+    escaped_name = sheet_name.replace("\\", "\\\\").replace("'", "\\'")
+    response = drive.files().list(
+        q=f"name = '{escaped_name}' and mimeType = 'application/vnd.google-apps.spreadsheet' and trashed = false",
+        fields='files(id, modifiedTime)', pageSize=1,
+        supportsAllDrives=True, includeItemsFromAllDrives=True,
+    ).execute()
+    files = response.get('files', [])
+    if not files:
+        raise LookupError(f"Spreadsheet '{sheet_name}' not found")
+    return files[0]['id'], files[0].get('modifiedTime')
+
+def _spreadsheet_by_key(drive, spreadsheet_id):
+    """Returns (spreadsheet_id, modifiedTime) with a direct Drive lookup by ID."""
+    response = drive.files().get(
+        fileId=spreadsheet_id, fields='id, modifiedTime', supportsAllDrives=True
+    ).execute()
+    return response['id'], response.get('modifiedTime')
+
+def load_all_sheets(_client, sheet_name, spreadsheet_key=None):
+    """
+    Reads every tab in SHEET_TABS and OPTIONAL_SHEET_TABS with one values.batchGet request.
+    Returns {tab_name: rows} (header row first), with None for optional tabs the sheet
+    does not have; empty if the spreadsheet could not be read.
+    On a machine that keeps .private_cache (not the Actions runner), a sheet that has not
+    been edited since the last run is served from disk after one Drive metadata query. Passing `spreadsheet_key`
+    turns that query into a direct lookup instead of a search by `sheet_name`.
+    """
+    if not _client: return {}
+    from gspread.exceptions import APIError
+
+    try:
+        drive = get_drive_service()
+        if not drive:
+            spreadsheet_id, modified_time = spreadsheet_key, None
+        elif spreadsheet_key:
+            spreadsheet_id, modified_time = _spreadsheet_by_key(drive, spreadsheet_key)
+        else:
+            spreadsheet_id, modified_time = _find_spreadsheet(drive, sheet_name)
+        params = {'tabs': SHEET_TABS + OPTIONAL_SHEET_TABS, 'render': 'UNFORMATTED_VALUE', 'modified': modified_time}
+        if modified_time:
+            cached = SHEET_CACHE.get(spreadsheet_id, 'sheet_values', params, UNCHANGED_SHEET_TTL)
+            if cached is not None:
+                print("Sheets unchanged since last run; using cached values.")
+                return cached
+        
+        spreadsheet = _client.open_by_key(spreadsheet_id) if spreadsheet_id else _client.open(sheet_name)
+        
+        def batch_get(tabs):
+            response = spreadsheet.values_batch_get(
+                ranges=[f"{tab}!A:Z" for tab in tabs],
+                params={'valueRenderOption': 'UNFORMATTED_VALUE'}
+            )
+            return {
+                tab: value_range.get('values', [])
+                for tab, value_range in zip(tabs, response.get('valueRanges', []))
+            }
+        
+        try:
+            sheet_values = batch_get(SHEET_TABS + OPTIONAL_SHEET_TABS)
+        except APIError as e:
+            # A missing tab fails the whole batch with a 400; retry with the required tabs only
+            if e.response.status_code != 400:
+                raise
+            sheet_values = batch_get(SHEET_TABS)
+            sheet_values.update(dict.fromkeys(OPTIONAL_SHEET_TABS))
+        if modified_time:
+            SHEET_CACHE.set(spreadsheet_id, 'sheet_values', params, sheet_values)
+        return sheet_values
+    except Exception as e:
+        print(f"Error loading sheets from '{sheet_name}': {e}")
+        return {}
+
+def load_portfolio(rows):
     try:
-        sheet = _client.open(sheet_name).worksheet("Portfolio")
-        data = sheet.get_all_records()
-        df = pd.DataFrame(data)
+        df = _values_to_frame(rows)
         df['Current_Value'] = pd.to_numeric(df['Current_Value'])
         return df
     except Exception as e:
         print(f"Error loading 'Portfolio' tab: {e}")
         return pd.DataFrame()
 
-def load_rules_from_sheet(_client, sheet_name):
-    if not _client: return pd.DataFrame()
+def load_rules_from_sheet(rows):
     try:
-        sheet = _client.open(sheet_name).worksheet("Rules")
-        data = sheet.get_all_records()
-        df = pd.DataFrame(data)
+        df = _values_to_frame(rows)
         df['Target_Percentage'] = pd.to_numeric(df['Target_Percentage'])
         df['Rebalance_Threshold'] = pd.to_numeric(df['Rebalance_Threshold'])
         return df
@@ -182,12 +353,12 @@ def load_rules_from_sheet(_client, sheet_name):
         print(f"Error loading 'Rules' tab: {e}")
         return pd.DataFrame()
 
-def load_watchlist(_client, sheet_name):
-    if not _client: return pd.DataFrame()
+def load_watchlist(rows):
+    if rows is None:
+        print("Error loading 'Watchlist' tab: the spreadsheet has no 'Watchlist' tab.")
+        return pd.DataFrame()
     try:
-        sheet = _client.open(sheet_name).worksheet("Watchlist")
-        data = sheet.get_all_records()
-        df = pd.DataFrame(data)
+        df = _values_to_frame(rows)
         df['Dip_Threshold_Percent'] = pd.to_numeric(df['Dip_Threshold_Percent'])
         return df
     except Exception as e:
@@ -203,33 +374,109 @@ def generate_rebalance_insights(portfolio_df, rules_df):
         return []
     try:
         print("Analyzing portfolio rebalancing...")
-        category_df = portfolio_df.groupby('Category')['Current_Value'].sum().reset_index()
-        total_value = category_df['Current_Value'].sum()
-        category_df['Current_Percentage'] = (category_df['Current_Value'] / total_value) * 100
-        merged_df = pd.merge(rules_df, category_df, on='Category', how='left')
-        merged_df['Current_Percentage'] = merged_df['Current_Percentage'].fillna(0)
-        merged_df['Drift'] = merged_df['Current_Percentage'] - merged_df['Target_Percentage']
-        merged_df['Is_Alert'] = abs(merged_df['Drift']) > merged_df['Rebalance_Threshold']
+        category_values = portfolio_df.groupby('Category')['Current_Value'].sum()
+        total_value = category_values.sum()
+        # Map each rule's category straight to its share instead of merging two frames
+        current_pct = rules_df['Category'].map(category_values).fillna(0) / total_value * 100
+        merged_df = rules_df.assign(
+            Current_Percentage=current_pct, Drift=current_pct - rules_df['Target_Percentage']
+        )
+        merged_df['Is_Alert'] = merged_df['Drift'].abs() > merged_df['Rebalance_Threshold']
         
-        for _, row in merged_df.iterrows():
-            if row['Is_Alert']:
-                curr_perc = row['Current_Percentage']
-                target_perc = row['Target_Percentage']
-                drift = row['Drift']
-                threshold = row['Rebalance_Threshold']
-                status = "over-allocated" if drift > 0 else "under-allocated"
-                message = (
-                    f"ALERT: Your '{row['Category']}' allocation is {curr_perc:.1f}% "
-                    f"(Target: {target_perc}%). This is {abs(drift):.1f}% {status} and "
-                    f"outside your {threshold}% threshold."
-                )
-                print(f"  > Insight: {message}")
-                insight_messages.append(message)
+        # Build the alert messages as whole columns, only for the rows that need one
+        alerts = merged_df[merged_df['Is_Alert']]
+        status = pd.Series(
+            np.where(alerts['Drift'] > 0, "over-allocated", "under-allocated"), index=alerts.index
+        )
+        messages = (
+            "ALERT: Your '" + alerts['Category'].astype(str) + "' allocation is "
+            + alerts['Current_Percentage'].map('{:.1f}'.format) + "% (Target: "
+            + alerts['Target_Percentage'].astype(str) + "%). This is "
+            + alerts['Drift'].abs().map('{:.1f}'.format) + "% " + status + " and outside your "
+            + alerts['Rebalance_Threshold'].astype(str) + "% threshold."
+        )
+        insight_messages = messages.tolist()
+        for message in insight_messages:
+            print(f"  > Insight: {message}")
         return insight_messages
     except Exception as e:
         print(f"An error occurred while generating rebalancing insights: {e}")
         return []
 
+# Daily closes are cached per ticker between runs, so each run only downloads the newest bars
+PRICE_CACHE = FileCache('.cache')
+# A weekly full refetch bounds how long any drift in the cached history can last.
+# Each entry records the day of its last full download, since topping it up rewrites
+# the entry (and its fetch time) on every run.
+PRICE_FULL_REFRESH_DAYS = 7
+PRICE_HISTORY_TTL = PRICE_FULL_REFRESH_DAYS * 24 * 60 * 60
+# Cached and fresh closes on the overlapping days must agree this closely, otherwise the
+# history was re-adjusted (split, dividend) and the ticker is downloaded again in full
+PRICE_OVERLAP_RTOL = 0.005
+
+def _download_prices(tickers, start, end):
+    """One threaded yf.download for `tickers`; returns {ticker: OHLC frame} for those with data."""
+    import yfinance as yf
+
+    prices = yf.download(
+        tickers=tickers, start=start, end=end, group_by='ticker',
+        threads=True, auto_adjust=True, progress=False
+    )
+    # Older yfinance versions return flat columns for a single symbol
+    if not prices.empty and not isinstance(prices.columns, pd.MultiIndex):
+        prices = pd.concat({tickers[0]: prices}, axis=1)
+    histories = {}
+    for ticker in prices.columns.get_level_values(0).unique():
+        hist = prices[ticker].dropna(how='all')
+        if not hist.empty:
+            histories[ticker] = hist
+    return histories
+
+def load_price_history(tickers, start, end):
+    """
+    Returns {ticker: daily OHLC frame from `start`}. Tickers cached by an earlier run only
+    fetch the bars since their last cached day; the rest, and any whose last full download
+    is PRICE_FULL_REFRESH_DAYS old, are downloaded in full.
+    """
+    params = {'auto_adjust': True}
+    today = dt.date.today()
+    warm, full_fetch_dates = {}, {}
+    for ticker in tickers:
+        # Entries are (date of the last full download, history)
+        entry = PRICE_CACHE.get(ticker, 'price_history', params, PRICE_HISTORY_TTL)
+        if entry is None:
+            continue
+        full_fetched_on, hist = entry
+        if (today - full_fetched_on).days < PRICE_FULL_REFRESH_DAYS and not hist.empty:
+            warm[ticker] = hist
+            full_fetch_dates[ticker] = full_fetched_on
+    
+    histories = {}
+    if warm:
+        # Start at the oldest last-cached day, so every warm ticker gets at least one overlapping bar
+        tail_start = min(hist.index[-1] for hist in warm.values()).date()
+        fresh = _download_prices(list(warm), tail_start, end)
+        for ticker, hist in warm.items():
+            new = fresh.get(ticker)
+            if new is None:
+                continue
+            overlap = hist.index.intersection(new.index)
+            if len(overlap) and np.allclose(
+                hist.loc[overlap, 'Close'], new.loc[overlap, 'Close'], rtol=PRICE_OVERLAP_RTOL, equal_nan=True
+            ):
+                histories[ticker] = pd.concat([hist[~hist.index.isin(new.index)], new]).sort_index()
+    
+    missing = [ticker for ticker in tickers if ticker not in histories]
+    if missing:
+        histories.update(_download_prices(missing, start, end))
+    
+    for ticker, hist in histories.items():
+        histories[ticker] = hist[hist.index >= pd.Timestamp(start)]
+        # A topped-up history keeps the date of its last full download
+        full_fetched_on = today if ticker in missing else full_fetch_dates[ticker]
+        PRICE_CACHE.set(ticker, 'price_history', params, (full_fetched_on, histories[ticker]))
+    return histories
+
 def check_market_dips(watchlist_df):
     """Checks for external market buying opportunities."""
     insight_messages = []
@@ -240,44 +487,51 @@ def check_market_dips(watchlist_df):
     today = dt.date.today()
     one_year_ago = today - dt.timedelta(days=365)
     
-    for _, row in watchlist_df.iterrows():
-        try:
-            ticker_symbol = row['Ticker']
-            asset_name = row['Asset_Name']
-            threshold = row['Dip_Threshold_Percent']
-            
-            ticker_obj = yf.Ticker(ticker_symbol)
-            data = ticker_obj.history(start=one_year_ago, end=today)
-            
-            if data.empty:
-                print(f"  > Warning: Could not get data for {asset_name} ({ticker_symbol}).")
-                continue
-
-            clean_high = data['High'].dropna()
-            clean_close = data['Close'].dropna()
-
-            if clean_high.empty or clean_close.empty:
-                print(f"  > Warning: No valid price data for {asset_name} ({ticker_symbol}).")
-                continue
-
-            high_52_week = clean_high.max()
-            current_price = clean_close.iloc[-1]
-            percent_from_high = ((current_price - high_52_week) / high_52_week) * 100
-            
-            if abs(percent_from_high) > threshold:
-                message = (
-                    f"OPPORTUNITY: {asset_name} ({ticker_symbol}) is {abs(percent_from_high):.1f}% "
-                    f"below its 52-week high (Current: ${current_price:,.2f}, High: ${high_52_week:,.2f}). "
-                    f"This is past your {threshold}% threshold."
-                )
-                print(f"  > Insight: {message}")
-                insight_messages.append(message)
-            else:
-                print(f"  > OK: {asset_name} is within threshold.")
-                
-        except Exception as e:
-            print(f"An error occurred while checking market dip for {row['Asset_Name']}: {e}")
-            
+    # Bulk downloads (fetched in parallel by yfinance) instead of a request per row,
+    # topped up from the previous run's cache
+    tickers = list(dict.fromkeys(watchlist_df['Ticker'].astype(str)))
+    try:
+        histories = load_price_history(tickers, one_year_ago, today)
+    except Exception as e:
+        print(f"An error occurred while downloading market data: {e}")
+        return []
+    if not histories:
+        print("  > Warning: Could not get data for any watchlist ticker.")
+        return []
+    prices = pd.concat(histories, axis=1)
+    
+    # 52-week high and latest close for every ticker in one pass over the whole frame
+    highs = prices.xs('High', axis=1, level=1).max()
+    last_close = prices.xs('Close', axis=1, level=1).ffill().iloc[-1]
+    pct_from_high = (last_close - highs) / highs * 100
+    
+    # Line every watchlist row up with its ticker's figures, then pick the alerts with one mask
+    rows = watchlist_df.assign(Ticker=watchlist_df['Ticker'].astype(str))
+    rows = rows.assign(
+        High=rows['Ticker'].map(highs), Current=rows['Ticker'].map(last_close),
+        Pct=rows['Ticker'].map(pct_from_high).abs(),
+    )
+    has_data = rows['High'].notna() & rows['Current'].notna()
+    is_alert = has_data & (rows['Pct'] > rows['Dip_Threshold_Percent'])
+    
+    for row in rows[~has_data].itertuples(index=False):
+        print(f"  > Warning: No valid price data for {row.Asset_Name} ({row.Ticker}).")
+    
+    alerts = rows[is_alert]
+    insight_messages = [
+        f"OPPORTUNITY: {name} ({ticker}) is {pct:.1f}% "
+        f"below its 52-week high (Current: ${current:,.2f}, High: ${high:,.2f}). "
+        f"This is past your {threshold}% threshold."
+        for name, ticker, pct, current, high, threshold in zip(
+            alerts['Asset_Name'], alerts['Ticker'], alerts['Pct'],
+            alerts['Current'], alerts['High'], alerts['Dip_Threshold_Percent'],
+        )
+    ]
+    for message in insight_messages:
+        print(f"  > Insight: {message}")
+    for asset_name in rows.loc[has_data & ~is_alert, 'Asset_Name']:
+        print(f"  > OK: {asset_name} is within threshold.")
+    
     return insight_messages
 
 
@@ -285,6 +539,8 @@ def check_market_dips(watchlist_df):
 def send_whatsapp_message(body):
     """Sends a WhatsApp message using Twilio."""
     try:
+        from twilio.rest import Client
+
         client = Client(twilio_sid, twilio_token)
         message = client.messages.create(
             from_=f'whatsapp:{twilio_phone}',
@@ -311,14 +567,26 @@ def main():
 
     # 2. Load all data
     print("Loading data from Google Sheets...")
-    portfolio_df = load_portfolio(gsheet_client, G_SHEET_NAME)
-    rules_df = load_rules_from_sheet(gsheet_client, G_SHEET_NAME)
-    watchlist_df = load_watchlist(gsheet_client, G_SHEET_NAME)
+    # One batchGet returns all three tabs
+    sheet_values = load_all_sheets(gsheet_client, G_SHEET_NAME, gsheet_key)
+    portfolio_df = load_portfolio(sheet_values.get('Portfolio', []))
+    rules_df = load_rules_from_sheet(sheet_values.get('Rules', []))
+    watchlist_df = load_watchlist(sheet_values.get('Watchlist', []))
     
     # 3. Generate all insights
-    rebalance_insights = generate_rebalance_insights(portfolio_df, rules_df)
-    market_insights = check_market_dips(watchlist_df)
-    news_insights = analyze_market_news(watchlist_df, groq_api_key) # <-- NEW CALL
+    if watchlist_df.empty:
+        # Nothing to scan or look up, so skip the worker threads altogether
+        rebalance_insights = generate_rebalance_insights(portfolio_df, rules_df)
+        market_insights, news_insights = [], []
+    else:
+        # The Yahoo price scan and the Groq news call are independent network waits,
+        # so they run side by side while the rebalance math happens here
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            market_future = executor.submit(check_market_dips, watchlist_df)
+            news_future = executor.submit(analyze_market_news, watchlist_df) # <-- NEW CALL
+            rebalance_insights = generate_rebalance_insights(portfolio_df, rules_df)
+            market_insights = market_future.result()
+            news_insights = news_future.result()
     
     # 4. Generate AI Summary
     if not rebalance_insights and not market_insights and not news_insights: # <-- UPDATED CHECK